@@ -0,0 +1,72 @@
+"""
+Бенчмарки представлений posts на объёмных данных.
+
+Запуск: pytest benchmarks -p no:cacheprovider
+
+Объёмы задаются переменными окружения BENCH_USERS, BENCH_GROUPS,
+BENCH_POSTS, BENCH_COMMENTS, BENCH_FOLLOWS, число замеров на
+представление — BENCH_REQUESTS. Результаты пишутся в BENCH_OUTPUT
+(по умолчанию bench_results.json). Если задан BENCH_BASELINE с
+результатами прошлого прогона, замер падает, когда медиана выросла
+больше чем в BENCH_TOLERANCE раз или запросов к базе стало больше.
+"""
+import json
+import os
+
+import pytest
+from django.conf import settings
+
+from .seed import seed
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+VOLUMES = {
+    'users': env_int('BENCH_USERS', 200),
+    'groups': env_int('BENCH_GROUPS', 10),
+    'posts': env_int('BENCH_POSTS', 5000),
+    'comments': env_int('BENCH_COMMENTS', 10000),
+    'follows': env_int('BENCH_FOLLOWS', 2000),
+}
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(tmp_path_factory):
+    # Файловая база вместо базы в памяти: так блокировки и журнал
+    # работают как на сервере, а процессы видят общие данные.
+    # Кеш и журнал событий тоже свои, чтобы не смешивать их с
+    # разработческими.
+    directory = tmp_path_factory.mktemp('db')
+    test_settings = settings.DATABASES['default'].setdefault('TEST', {})
+    test_settings['NAME'] = str(directory / 'bench.sqlite3')
+    settings.CACHES['default']['LOCATION'] = str(directory / 'bench.cache')
+    settings.EVENTS_LOCATION = str(directory / 'events.sqlite3')
+
+
+@pytest.fixture(scope='session')
+def bench_data(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        return seed(**VOLUMES)
+
+
+@pytest.fixture(scope='session')
+def bench_baseline():
+    path = os.environ.get('BENCH_BASELINE')
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as baseline:
+        return json.load(baseline)['results']
+
+
+@pytest.fixture(scope='session')
+def bench_results():
+    results = {}
+    yield results
+    path = os.environ.get('BENCH_OUTPUT', 'bench_results.json')
+    volumes = dict(VOLUMES, requests=env_int('BENCH_REQUESTS', 50))
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump({'volumes': volumes, 'results': results}, output,
+                  indent=2, ensure_ascii=False)
+
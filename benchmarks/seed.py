@@ -0,0 +1,67 @@
+"""
+Наполнение базы данными для бенчмарков через bulk_create.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from posts.bulk import bulk_insert, explicit_dates, finish_load
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+PASSWORD = 'bench-password'
+
+
+def seed(users, groups, posts, comments, follows, random_seed=0):
+    rnd = random.Random(random_seed)
+    now = timezone.now()
+    password = make_password(PASSWORD)
+
+    bulk_insert(User, (User(username=f'bench_user_{i}', password=password)
+                       for i in range(users)))
+    user_ids = list(User.objects.filter(
+        username__startswith='bench_user_'
+    ).values_list('id', flat=True))
+
+    bulk_insert(Group, (Group(title=f'Группа {i}', slug=f'bench-group-{i}',
+                              description='Группа для бенчмарков')
+                        for i in range(groups)))
+    group_ids = list(Group.objects.filter(
+        slug__startswith='bench-group-'
+    ).values_list('id', flat=True))
+
+    with explicit_dates(Post._meta.get_field('pub_date'),
+                        Comment._meta.get_field('created')):
+        bulk_insert(Post, (
+            Post(text=f'Пост номер {i} для проверки скорости ленты',
+                 author_id=rnd.choice(user_ids),
+                 group_id=rnd.choice(group_ids + [None]),
+                 pub_date=now - timedelta(minutes=posts - i))
+            for i in range(posts)
+        ))
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        bulk_insert(Comment, (
+            Comment(post_id=rnd.choice(post_ids),
+                    author_id=rnd.choice(user_ids),
+                    text=f'Комментарий {i}',
+                    created=now - timedelta(seconds=comments - i))
+            for i in range(comments)
+        ))
+
+    pairs = set()
+    while len(pairs) < min(follows, users * (users - 1)):
+        user_id, author_id = rnd.sample(user_ids, 2)
+        pairs.add((user_id, author_id))
+    bulk_insert(Follow, (Follow(user_id=user_id, author_id=author_id)
+                         for user_id, author_id in pairs))
+
+    finish_load()
+    return {
+        'user_ids': user_ids,
+        'group_ids': group_ids,
+        'post_ids': post_ids,
+    }
@@ -0,0 +1,111 @@
+"""
+Пропускная способность yatube.asgi против WSGI-сервера с тем же числом
+потоков (а значит, соединений с базой и памяти).
+
+Клиенты медленные: BENCH_CLIENT_DELAY секунд уходит на передачу
+запроса, как у мобильной сети. WSGI-сервер держит поток, пока читает
+такой запрос; ASGI-приложение принимает его в цикле asyncio и занимает
+поток только на время работы Django.
+"""
+import asyncio
+import io
+import os
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+
+from .conftest import env_int
+from .test_views import feed_urls
+
+CLIENTS = env_int('BENCH_CLIENTS', 64)
+TOTAL = env_int('BENCH_ASGI_REQUESTS', 256)
+DELAY = float(os.environ.get('BENCH_CLIENT_DELAY', 0.05))
+
+
+def scope(url):
+    return {'type': 'http', 'method': 'GET', 'path': url,
+            'query_string': b'', 'headers': []}
+
+
+def run_wsgi(url):
+    from yatube import asgi
+
+    handler = WSGIHandler()
+
+    def serve(_):
+        time.sleep(DELAY)
+        environ = asgi._environ(scope(url), io.BytesIO())
+        response = handler(environ, lambda status, headers: None)
+        b''.join(response)
+        response.close()
+        return response.status_code
+
+    with ThreadPoolExecutor(settings.ASGI_THREADS) as pool:
+        return list(pool.map(serve, range(TOTAL)))
+
+
+def run_asgi(url):
+    from yatube import asgi
+
+    async def serve(slots):
+        async with slots:
+            statuses = []
+
+            async def receive():
+                await asyncio.sleep(DELAY)
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+
+            await asgi.application(scope(url), receive, send)
+            return statuses[0]
+
+    async def main():
+        slots = asyncio.Semaphore(CLIENTS)
+        return await asyncio.gather(*(serve(slots) for _ in range(TOTAL)))
+
+    return asyncio.run(main())
+
+
+def throughput(run, url):
+    run(url)
+    start = time.perf_counter()
+    statuses = run(url)
+    elapsed = time.perf_counter() - start
+    assert set(statuses) == {200}, f'`{url}` ответил {set(statuses)}'
+
+    tracemalloc.start()
+    run(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'requests_per_second': round(TOTAL / elapsed, 1),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+class TestAsgiBenchmark:
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('name', ['index', 'group_posts', 'profile',
+                                      'post_view'])
+    def test_asgi_vs_wsgi(self, name, bench_data, bench_results):
+        url = feed_urls(bench_data)[name]
+        wsgi = throughput(run_wsgi, url)
+        asgi = throughput(run_asgi, url)
+        bench_results[f'asgi_{name}'] = {
+            'url': url,
+            'threads': settings.ASGI_THREADS,
+            'clients': CLIENTS,
+            'client_delay_ms': DELAY * 1000,
+            'wsgi': wsgi,
+            'asgi': asgi,
+        }
+        assert asgi['requests_per_second'] > wsgi['requests_per_second'], \
+            f'`{name}`: ASGI не быстрее WSGI при тех же потоках'
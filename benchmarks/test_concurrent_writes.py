@@ -0,0 +1,109 @@
+import multiprocessing
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connections
+from django.test import Client
+
+from posts.models import Comment, Post
+from .conftest import env_int
+
+WRITERS = env_int('BENCH_WRITERS', 8)
+WRITES = env_int('BENCH_WRITES', 25)
+
+CONFIGURATIONS = [
+    # Как у django.db.backends.sqlite3: BEGIN без IMMEDIATE, 5 секунд.
+    ('stock', {'begin': 'DEFERRED', 'timeout': 5}),
+    # Настройки yatube.backends.sqlite3 по умолчанию.
+    ('immediate', {}),
+]
+
+
+def writer(number, post, errors, options):
+    # Процессы, как воркеры gunicorn: соединение родителя не наследуем.
+    for conn in connections.all():
+        conn.connection = None
+    # Каждый запрос в транзакции, как при ATOMIC_REQUESTS в продакшене.
+    settings_dict = connections['default'].settings_dict
+    settings_dict['ATOMIC_REQUESTS'] = True
+    settings_dict['OPTIONS'] = dict(settings_dict['OPTIONS'], **options)
+    client = Client()
+    client.force_login(get_user_model().objects.get(
+        username=f'writer_{number}'
+    ))
+    comment_url = f'/{post.author.username}/{post.pk}/comment/'
+    try:
+        for i in range(WRITES):
+            try:
+                client.post('/new/', {'text': f'Пост {number}-{i}'})
+                client.post(comment_url, {'text': f'Комментарий {number}-{i}'})
+            except DatabaseError as error:
+                errors.put(repr(error))
+    finally:
+        connections.close_all()
+
+
+def run_writers(post, options):
+    """
+    Запускает WRITERS процессов с настройками базы options и возвращает
+    ошибки и время работы.
+    """
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    processes = [context.Process(target=writer,
+                                 args=(number, post, queue, options))
+                 for number in range(WRITERS)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    errors = []
+    while not queue.empty():
+        errors.append(queue.get())
+    return errors, elapsed
+
+
+class TestConcurrentWrites:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_immediate_transactions_do_not_lock(self, bench_results):
+        """
+        Та же нагрузка на настройках обычного django.db.backends.sqlite3
+        (BEGIN DEFERRED, timeout 5) ловит «database is locked», а на
+        BEGIN IMMEDIATE бэкенда yatube проходит без ошибок.
+        """
+        User = get_user_model()
+        for number in range(WRITERS):
+            User.objects.create_user(username=f'writer_{number}')
+        post = Post.objects.create(text='Общий пост',
+                                   author=User.objects.get(username='writer_0'))
+        writes = WRITERS * WRITES
+
+        results = {}
+        for name, options in CONFIGURATIONS:
+            posts_before = Post.objects.count()
+            comments_before = Comment.objects.filter(post=post).count()
+            errors, elapsed = run_writers(post, options)
+            saved = (Post.objects.count() - posts_before
+                     + Comment.objects.filter(post=post).count()
+                     - comments_before)
+            results[name] = errors
+            bench_results[f'concurrent_writes_{name}'] = {
+                'writers': WRITERS,
+                'writes': writes * 2,
+                'saved': saved,
+                'errors': len(errors),
+                'writes_per_second': round(saved / elapsed, 1),
+            }
+            if name == 'immediate':
+                assert saved == writes * 2, \
+                    'Проверьте, что сохранились все посты и комментарии'
+
+        assert any('database is locked' in error
+                   for error in results['stock']), \
+            'Нагрузка не воспроизвела блокировку на настройках по умолчанию'
+        assert not results['immediate'], \
+            f'Конкурентные записи упали: {results["immediate"][:3]}'
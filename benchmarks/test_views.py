@@ -0,0 +1,126 @@
+import math
+import os
+import time
+import tracemalloc
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from posts import swr
+from posts.models import Follow, Post
+from .conftest import env_int
+from .seed import PASSWORD
+
+REQUESTS = env_int('BENCH_REQUESTS', 50)
+TOLERANCE = float(os.environ.get('BENCH_TOLERANCE', 1.25))
+# cold — кеш очищается перед каждым запросом, warm — нет.
+CACHE_MODE = os.environ.get('BENCH_CACHE', 'cold')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1,
+                       math.ceil(fraction * len(ordered)) - 1)]
+
+
+def request(client, method, url, data, cache_mode=CACHE_MODE):
+    if cache_mode == 'cold':
+        caches['default'].clear()
+    response = getattr(client, method)(url, data)
+    assert response.status_code in (200, 302), \
+        f'Страница `{url}` ответила {response.status_code}'
+
+
+def measure(client, method, url, data=None, cache_mode=CACHE_MODE):
+    data = data or {}
+    request(client, method, url, data, cache_mode)
+    timings, queries = [], []
+    for _ in range(REQUESTS):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            request(client, method, url, data, cache_mode)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+
+    # tracemalloc замедляет код, поэтому память меряем отдельным запросом.
+    tracemalloc.start()
+    request(client, method, url, data, cache_mode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'url': url,
+        'requests': REQUESTS,
+        'cache': cache_mode,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+@pytest.fixture
+def reader(bench_data):
+    follow = Follow.objects.select_related('user').first()
+    client = Client()
+    client.login(username=follow.user.username, password=PASSWORD)
+    return client
+
+
+def feed_urls(bench_data):
+    post = Post.objects.select_related('author').order_by(
+        '-comment_count'
+    ).first()
+    last_page = math.ceil(len(bench_data['post_ids']) / 10)
+    return {
+        'index': '/',
+        'index_deep_page': f'/?page={last_page}',
+        'group_posts': '/group/bench-group-0/',
+        'profile': f'/{post.author.username}/',
+        'post_view': f'/{post.author.username}/{post.pk}/',
+    }
+
+
+class TestViewsBenchmark:
+
+    def record(self, name, result, bench_results, bench_baseline):
+        bench_results[name] = result
+        baseline = bench_baseline.get(name)
+        if not baseline:
+            return
+        assert result['p50_ms'] <= baseline['p50_ms'] * TOLERANCE, \
+            f'`{name}`: медиана выросла с {baseline["p50_ms"]} до {result["p50_ms"]} мс'
+        assert result['queries_per_request'] <= baseline['queries_per_request'], \
+            f'`{name}`: запросов к базе стало больше ({result["queries_per_request"]})'
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('name', ['index', 'index_deep_page', 'group_posts',
+                                      'profile', 'post_view'])
+    def test_feed_views(self, name, bench_data, bench_results, bench_baseline):
+        url = feed_urls(bench_data)[name]
+        result = measure(Client(), 'get', url)
+        self.record(name, result, bench_results, bench_baseline)
+
+    @pytest.mark.django_db
+    def test_follow_index(self, reader, bench_results, bench_baseline):
+        result = measure(reader, 'get', '/follow/')
+        self.record('follow_index', result, bench_results, bench_baseline)
+
+    @pytest.mark.django_db
+    def test_add_comment(self, reader, bench_data, bench_results, bench_baseline):
+        post = Post.objects.select_related('author').first()
+        url = f'/{post.author.username}/{post.pk}/comment/'
+        result = measure(reader, 'post', url, {'text': 'Комментарий из бенчмарка'})
+        self.record('add_comment', result, bench_results, bench_baseline)
+
+    @pytest.mark.django_db
+    def test_index_expiring(self, monkeypatch, bench_data, bench_results,
+                            bench_baseline):
+        # Каждый запрос видит фрагмент устаревшим: p99 должен остаться
+        # как у тёплого кеша, потому что пересчёт идёт в фоне.
+        monkeypatch.setattr(swr, '_is_fresh', lambda *args: False)
+        result = measure(Client(), 'get', '/', cache_mode='stale')
+        self.record('index_expiring', result, bench_results, bench_baseline)
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .queue import task
+
+
+@task
+def send_email(subject, message, recipients):
+    """
+    Письмо от DEFAULT_FROM_EMAIL; ошибка почтового сервера приведёт к
+    повтору задачи.
+    """
+    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipients,
+              fail_silently=False)
@@ -0,0 +1,76 @@
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from jobs import queue
+
+PRUNE_EVERY = 3600
+
+
+def _run(job):
+    try:
+        return queue.run(job)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=getattr(settings, 'JOBS_CONCURRENCY', 4),
+            help='Сколько задач выполнять одновременно',
+        )
+        parser.add_argument(
+            '--poll', type=float,
+            default=getattr(settings, 'JOBS_POLL_INTERVAL', 1),
+            help='Пауза между проверками пустой очереди, секунд',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти',
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        concurrency = max(options['concurrency'], 1)
+        running = set()
+        processed = 0
+        pruned_at = time.monotonic()
+        with ThreadPoolExecutor(concurrency,
+                                thread_name_prefix='job') as pool:
+            try:
+                while not self.stopping:
+                    jobs = queue.claim(concurrency - len(running))
+                    running.update(pool.submit(_run, job) for job in jobs)
+                    if options['once'] and not running:
+                        break
+                    if time.monotonic() - pruned_at > PRUNE_EVERY:
+                        queue.prune()
+                        pruned_at = time.monotonic()
+                    if not running:
+                        time.sleep(options['poll'])
+                        continue
+                    # Ждём освобождения места в пуле, а при наличии
+                    # места — не дольше паузы опроса.
+                    finished, running = wait(
+                        running, return_when=FIRST_COMPLETED,
+                        timeout=None if len(running) >= concurrency
+                        else options['poll'],
+                    )
+                    processed += len(finished)
+            except KeyboardInterrupt:
+                self.stopping = True
+            # Начатые задачи доделываем, новые не берём.
+            processed += len(wait(running).done)
+        self.stdout.write(f'Обработано задач: {processed}')
+
+    def stop(self, *args):
+        self.stopping = True
@@ -0,0 +1,139 @@
+"""
+Очередь фоновых задач в таблице Job.
+
+Функция с декоратором @task выполняется воркером (manage.py run_jobs)
+после вызова .delay(**kwargs). Запись о задаче создаётся в той же
+транзакции, что и данные запроса, поэтому задача не потеряется и не
+выполнится для отменённых изменений. Воркер занимает задачу
+условным UPDATE, так что несколько воркеров не возьмут одну задачу. Если
+воркер упал, задача освобождается через JOBS_LOCK_TIMEOUT секунд.
+Неудачная задача повторяется с экспоненциальной задержкой, пока не
+кончатся попытки.
+"""
+import json
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class Task:
+    """
+    Функция, которую можно поставить в очередь.
+    """
+
+    def __init__(self, func, max_attempts=None):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__name__}'
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def delay(self, countdown=0, **kwargs):
+        return enqueue(self.name, kwargs, countdown=countdown,
+                       max_attempts=self.max_attempts)
+
+
+def task(func=None, *, max_attempts=None):
+    if func is None:
+        return lambda func: Task(func, max_attempts)
+    return Task(func, max_attempts)
+
+
+def enqueue(name, payload, countdown=0, max_attempts=None):
+    return Job.objects.create(
+        name=name,
+        payload=json.dumps(payload, cls=DjangoJSONEncoder),
+        run_at=timezone.now() + timedelta(seconds=countdown),
+        max_attempts=max_attempts or _setting('JOBS_MAX_ATTEMPTS', 5),
+    )
+
+
+def _due(now):
+    # Задачи из очереди и задачи упавших воркеров с истёкшей блокировкой.
+    return (Q(status=Job.QUEUED, run_at__lte=now)
+            | Q(status=Job.RUNNING, locked_until__lt=now))
+
+
+def claim(limit):
+    """
+    Занимает до limit готовых к запуску задач и возвращает их.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(_due(now)).order_by('run_at').values_list(
+        'id', flat=True
+    )[:limit]
+    locked_until = now + timedelta(
+        seconds=_setting('JOBS_LOCK_TIMEOUT', 300)
+    )
+    claimed = [
+        pk for pk in candidates
+        if Job.objects.filter(_due(now), pk=pk).update(
+            status=Job.RUNNING, locked_until=locked_until,
+            attempts=F('attempts') + 1,
+        )
+    ]
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_at'))
+
+
+def backoff(attempts):
+    """
+    Задержка перед следующей попыткой: растёт вдвое с каждой неудачей,
+    со случайной добавкой, чтобы повторы не совпадали.
+    """
+    base = _setting('JOBS_BACKOFF', 30)
+    delay = min(base * 2 ** (attempts - 1), _setting('JOBS_MAX_BACKOFF',
+                                                       3600))
+    return delay + random.uniform(0, delay / 10)
+
+
+def run(job):
+    """
+    Выполняет занятую задачу и записывает результат.
+    """
+    try:
+        target = import_string(job.name)
+        if not isinstance(target, Task):
+            raise TypeError(f'{job.name} не объявлена через @task')
+        target(**json.loads(job.payload))
+    except Exception as error:
+        logger.exception('Задача %s упала', job)
+        job.last_error = repr(error)
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=backoff(job.attempts)
+            )
+    else:
+        job.status = Job.DONE
+    job.locked_until = None
+    job.save(update_fields=['status', 'run_at', 'locked_until',
+                            'last_error'])
+    return job.status
+
+
+def prune():
+    """
+    Удаляет выполненные задачи старше JOBS_RETENTION секунд.
+    """
+    before = timezone.now() - timedelta(
+        seconds=_setting('JOBS_RETENTION', 7 * 24 * 3600)
+    )
+    return Job.objects.filter(status=Job.DONE, run_at__lt=before).delete()[0]
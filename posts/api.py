@@ -0,0 +1,267 @@
+"""
+JSON API лент только для чтения.
+
+Посты читаются через values() без создания моделей и без шаблонов.
+Авторы и группы страницы подгружаются отдельно, одним запросом на
+каждую таблицу по id из строк постов. Число комментариев хранится в
+самом посте, поэтому отдельный запрос для него не нужен. Параметр
+?fields=id,text,author оставляет в ответе только перечисленные поля.
+Поля, которые не запрошены, не читаются из базы. Лента листается
+курсором ?cursor= из поля next предыдущего ответа.
+
+Чтобы узнать о новых постах, клиент опрашивает .../new/?since= с
+курсором since из первой страницы. В ответе только число и id постов
+новее курсора. ETag ответа строится из версий лент (versions), поэтому
+если лента не менялась, ответ 304 отдаётся без запросов к постам.
+"""
+import hashlib
+
+from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import etag
+
+from yatube.routers import read_replica
+
+from . import timeline, versions
+from .models import Group, Post, User
+from .pagination import (PER_PAGE, CursorPaginator, decode_cursor,
+                         encode_cursor)
+
+MAX_PER_PAGE = 100
+# Поле ответа -> колонки Post, которые для него нужны.
+FIELDS = {
+    'id': ('id',),
+    'text': ('text',),
+    'pub_date': ('pub_date',),
+    'author': ('author_id',),
+    'group': ('group_id',),
+    'image': ('image',),
+    'comment_count': ('comment_count',),
+}
+AUTHOR_FIELDS = ('id', 'username', 'first_name', 'last_name')
+GROUP_FIELDS = ('id', 'slug', 'title')
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _fields(request):
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(FIELDS)
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = sorted(set(fields) - set(FIELDS))
+    if unknown or not fields:
+        raise BadRequest(
+            f'Неизвестные поля: {", ".join(unknown)}; '
+            f'доступны: {", ".join(FIELDS)}'
+        )
+    return fields
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', PER_PAGE))
+    except ValueError:
+        raise BadRequest('limit должен быть числом')
+    return min(max(limit, 1), MAX_PER_PAGE)
+
+
+def _columns(fields):
+    # pub_date и id нужны курсору, даже если их нет в ответе.
+    columns = {'id', 'pub_date'}
+    for name in fields:
+        columns.update(FIELDS[name])
+    return sorted(columns)
+
+
+def _related(rows, fields):
+    authors = groups = {}
+    if 'author' in fields:
+        ids = {row['author_id'] for row in rows}
+        authors = {author['id']: author for author in
+                   User.objects.filter(id__in=ids).values(*AUTHOR_FIELDS)}
+    if 'group' in fields:
+        ids = {row['group_id'] for row in rows} - {None}
+        if ids:
+            groups = {group['id']: group for group in
+                      Group.objects.filter(id__in=ids).values(*GROUP_FIELDS)}
+    return authors, groups
+
+
+def serialize(rows, fields):
+    """
+    Словари постов для ответа из строк values() с нужными колонками.
+    """
+    authors, groups = _related(rows, fields)
+    image_storage = Post._meta.get_field('image').storage
+    posts = []
+    for row in rows:
+        post = {}
+        for name in fields:
+            if name == 'author':
+                post[name] = authors.get(row['author_id'])
+            elif name == 'group':
+                post[name] = groups.get(row['group_id'])
+            elif name == 'image':
+                post[name] = row['image'] and image_storage.url(row['image'])
+            else:
+                post[name] = row[name]
+        posts.append(post)
+    return posts
+
+
+def feed_response(request, post_list):
+    """
+    Страница ленты в JSON: посты и курсор следующей страницы.
+    """
+    try:
+        fields = _fields(request)
+        limit = _limit(request)
+    except BadRequest as error:
+        return _error(str(error), 400)
+    # Ответ API листается только вперёд, курсор prev считается битым.
+    position = decode_cursor(request.GET.get('cursor'))
+    if position is not None and position[0] != 'next':
+        position = None
+    paginator = CursorPaginator(post_list.values(*_columns(fields)), limit)
+    rows = list(paginator.forward_queryset(position and position[1:]))
+    data = {'next': None}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        data['next'] = encode_cursor('next', rows[-1]['pub_date'],
+                                     rows[-1]['id'])
+    if position is None:
+        # Первая страница даёт курсор для опроса новых постов.
+        data['since'] = None
+        if rows:
+            data['since'] = encode_cursor('prev', rows[0]['pub_date'],
+                                          rows[0]['id'])
+    data['results'] = serialize(rows, fields)
+    return JsonResponse(data)
+
+
+def since_response(request, post_list):
+    """
+    Число и id постов ленты новее курсора ?since= (самые новые первыми,
+    не больше MAX_PER_PAGE) и курсор для следующего опроса.
+    """
+    position = decode_cursor(request.GET.get('since'))
+    if position is None:
+        return _error('Нужен курсор since', 400)
+    _, pub_date, pk = position
+    newer = post_list.filter(pub_date__gte=pub_date).filter(
+        Q(pub_date__gt=pub_date) | Q(id__gt=pk)
+    ).order_by('-pub_date', '-id')
+    rows = list(newer.values_list('id', 'pub_date')[:MAX_PER_PAGE])
+    count = len(rows) if len(rows) < MAX_PER_PAGE else newer.count()
+    since = request.GET['since']
+    if rows:
+        since = encode_cursor('prev', rows[0][1], rows[0][0])
+    return JsonResponse({'count': count, 'ids': [row[0] for row in rows],
+                         'since': since})
+
+
+def _since_etag(scopes):
+    # Любое изменение поста увеличивает GLOBAL, так что лентам группы
+    # и автора хватает общей версии без запроса за их id.
+    def etag_func(request, **kwargs):
+        raw = '\n'.join([request.get_full_path(),
+                         versions.cache_version(*scopes(request))])
+        return hashlib.md5(raw.encode()).hexdigest()
+    return etag(etag_func)
+
+
+def _global_scopes(request):
+    return [versions.GLOBAL]
+
+
+def _follow_scopes(request):
+    # Подписка и отписка увеличивают версию автора-подписчика.
+    return [versions.GLOBAL, versions.author_scope(request.user.pk)]
+
+
+def _group_posts(slug):
+    group = get_object_or_404(Group.objects.only('id'), slug=slug)
+    return Post.objects.filter(group=group)
+
+
+def _author_posts(username):
+    author = get_object_or_404(User.objects.only('id'), username=username)
+    return Post.objects.filter(author=author)
+
+
+def _follow_posts(user):
+    if timeline.is_enabled():
+        return timeline.timeline_posts(user)
+    return Post.objects.filter(author__following__user=user)
+
+
+@read_replica
+def index(request):
+    return feed_response(request, Post.objects.all())
+
+
+@_since_etag(_global_scopes)
+@read_replica
+def index_since(request):
+    return since_response(request, Post.objects.all())
+
+
+@read_replica
+def group_posts(request, slug):
+    return feed_response(request, _group_posts(slug))
+
+
+@_since_etag(_global_scopes)
+@read_replica
+def group_since(request, slug):
+    return since_response(request, _group_posts(slug))
+
+
+@read_replica
+def profile(request, username):
+    return feed_response(request, _author_posts(username))
+
+
+@_since_etag(_global_scopes)
+@read_replica
+def profile_since(request, username):
+    return since_response(request, _author_posts(username))
+
+
+@read_replica
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return _error('Требуется авторизация', 401)
+    return feed_response(request, _follow_posts(request.user))
+
+
+@read_replica
+def follow_since(request):
+    if not request.user.is_authenticated:
+        return _error('Требуется авторизация', 401)
+    return _follow_since(request)
+
+
+@_since_etag(_follow_scopes)
+def _follow_since(request):
+    return since_response(request, _follow_posts(request.user))
+
+
+@read_replica
+def post_view(request, post_id):
+    try:
+        fields = _fields(request)
+    except BadRequest as error:
+        return _error(str(error), 400)
+    row = Post.objects.filter(id=post_id).values(*_columns(fields)).first()
+    if row is None:
+        return _error('Пост не найден', 404)
+    return JsonResponse(serialize([row], fields)[0])
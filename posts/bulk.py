@@ -0,0 +1,232 @@
+"""
+Массовая загрузка пользователей, групп, постов, комментариев и подписок.
+
+Записи читаются потоком и пишутся пачками bulk_create, каждая пачка в
+своей транзакции. Внешние ключи разрешаются через словари в памяти:
+username -> id и slug -> id. Посты и комментарии в памяти не хранятся,
+поэтому потребление памяти растёт только с числом пользователей и групп.
+"""
+import itertools
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.utils.dateparse import parse_datetime
+
+from . import counters, search, timeline, versions
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+MODELS = ('user', 'group', 'post', 'comment', 'follow')
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """
+    Отключает auto_now_add, чтобы bulk_create сохранил заданные даты.
+    """
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+def bulk_insert(model, objects, batch_size=BATCH_SIZE):
+    """
+    Пишет объекты пачками, не держа их все в памяти. Размер одного
+    INSERT Django подбирает под ограничения базы.
+    """
+    objects = iter(objects)
+    while True:
+        batch = list(itertools.islice(objects, batch_size))
+        if not batch:
+            return
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+
+
+def finish_load():
+    """
+    bulk_create не отправляет сигналы, поэтому после загрузки
+    пересчитываем счётчики, поисковый индекс и ленты подписок.
+    """
+    counters.recount()
+    search.get_backend().rebuild()
+    if timeline.is_enabled():
+        for user in User.objects.iterator():
+            timeline.rebuild(user)
+    invalidate_feeds()
+
+
+def invalidate_feeds():
+    """
+    Новые версии всех лент вместо cache.clear(): фрагменты и страницы
+    получают новые ключи, а миниатюры, сессии и прочий кеш остаются.
+    """
+    groups = [versions.group_scope(pk)
+              for pk in Group.objects.values_list('pk', flat=True)]
+    authors = [versions.author_scope(pk)
+               for pk in User.objects.values_list('pk', flat=True).iterator()]
+    versions.bump(versions.GLOBAL, *groups, *authors)
+    counters.reset_feed_counts(versions.GLOBAL, *groups)
+
+
+class Importer:
+    """
+    Принимает записи вида {'model': 'post', ...} и пишет их пачками.
+    Пачка сбрасывается при заполнении и при смене модели, поэтому
+    родительские записи должны идти раньше ссылающихся на них.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.users = dict(User.objects.values_list('username', 'id'))
+        self.groups = dict(Group.objects.values_list('slug', 'id'))
+        self.model = None
+        self.pending = []
+        self.loaded = dict.fromkeys(MODELS, 0)
+        self.unusable_password = UNUSABLE_PASSWORD_PREFIX + get_random_string(40)
+
+    def add(self, model, record):
+        if model not in MODELS:
+            raise ValueError(f'Неизвестная модель: {model}')
+        if model != self.model or len(self.pending) >= self.batch_size:
+            self.flush()
+            self.model = model
+        # Уже существующих пользователей и группы не перезаписываем,
+        # чтобы выгрузку можно было загрузить в непустую базу.
+        if model == 'user' and record['username'] in self.users or \
+                model == 'group' and record['slug'] in self.groups:
+            return
+        self.pending.append(getattr(self, f'_{model}')(record))
+
+    def flush(self):
+        if not self.pending:
+            return
+        objects, self.pending = self._new(self.pending), []
+        if not objects:
+            return
+        with explicit_dates(Post._meta.get_field('pub_date'),
+                            Comment._meta.get_field('created')):
+            try:
+                with transaction.atomic():
+                    type(objects[0]).objects.bulk_create(objects)
+            except IntegrityError as error:
+                raise ValueError(
+                    f'Не удалось записать пачку {self.model}: {error}'
+                ) from error
+        self.loaded[self.model] += len(objects)
+        # В Django 2.2 bulk_create на SQLite не возвращает id, поэтому
+        # новые ключи для словарей дочитываем из базы.
+        if self.model == 'user':
+            self.users.update(User.objects.filter(
+                username__in=[user.username for user in objects]
+            ).values_list('username', 'id'))
+        elif self.model == 'group':
+            self.groups.update(Group.objects.filter(
+                slug__in=[group.slug for group in objects]
+            ).values_list('slug', 'id'))
+
+    def _new(self, objects):
+        """
+        Убирает подписки и посты с комментариями с явными id, которые
+        уже есть в базе, чтобы прерванную загрузку можно было повторить.
+        """
+        model = type(objects[0])
+        if model is Follow:
+            existing = set(Follow.objects.filter(
+                user_id__in={follow.user_id for follow in objects}
+            ).values_list('user_id', 'author_id'))
+            new = []
+            for follow in objects:
+                pair = (follow.user_id, follow.author_id)
+                if pair not in existing:
+                    existing.add(pair)
+                    new.append(follow)
+            return new
+        if model in (Post, Comment):
+            existing = set(model.objects.filter(
+                pk__in=[obj.pk for obj in objects if obj.pk is not None]
+            ).values_list('pk', flat=True))
+            return [obj for obj in objects if obj.pk not in existing]
+        return objects
+
+    def finish(self):
+        self.flush()
+        # Посты и комментарии могли прийти с явными id.
+        sequences = connection.ops.sequence_reset_sql(no_style(),
+                                                      [Post, Comment])
+        with connection.cursor() as cursor:
+            for sql in sequences:
+                cursor.execute(sql)
+        finish_load()
+        return self.loaded
+
+    def _date(self, value):
+        if not value:
+            return timezone.now()
+        if isinstance(value, str):
+            value = parse_datetime(value)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+    def _user_id(self, username):
+        try:
+            return self.users[username]
+        except KeyError:
+            raise ValueError(f'Неизвестный пользователь: {username}')
+
+    def _group_id(self, slug):
+        if not slug:
+            return None
+        try:
+            return self.groups[slug]
+        except KeyError:
+            raise ValueError(f'Неизвестная группа: {slug}')
+
+    def _user(self, record):
+        return User(
+            username=record['username'],
+            password=record.get('password') or self.unusable_password,
+            first_name=record.get('first_name', ''),
+            last_name=record.get('last_name', ''),
+            email=record.get('email', ''),
+        )
+
+    def _group(self, record):
+        return Group(title=record['title'], slug=record['slug'],
+                     description=record.get('description', ''))
+
+    def _post(self, record):
+        return Post(
+            id=record.get('id') or None,
+            text=record['text'],
+            author_id=self._user_id(record['author']),
+            group_id=self._group_id(record.get('group')),
+            image=record.get('image') or None,
+            pub_date=self._date(record.get('pub_date')),
+        )
+
+    def _comment(self, record):
+        return Comment(
+            id=record.get('id') or None,
+            post_id=int(record['post']),
+            author_id=self._user_id(record['author']),
+            text=record['text'],
+            created=self._date(record.get('created')),
+        )
+
+    def _follow(self, record):
+        return Follow(user_id=self._user_id(record['user']),
+                      author_id=self._user_id(record['author']))
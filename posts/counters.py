@@ -0,0 +1,140 @@
+"""
+Денормализованные счётчики постов, подписчиков, подписок и комментариев.
+
+Счётчики меняются атомарно через F() в обработчиках сигналов, поэтому
+карточке профиля и карточке поста не нужны агрегатные запросы.
+Расхождения чинит команда recount_counters.
+
+Число постов всей ленты и групп для паджинатора хранится в кеше:
+считается COUNT(*) при промахе, затем сигналы меняют его через incr,
+а таймаут FEED_COUNT_TIMEOUT ограничивает накопленную ошибку.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from . import versions
+from .models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+def _subcount(model, field, outer):
+    rows = (
+        model.objects.filter(**{field: OuterRef(outer)})
+        .order_by()
+        .values(field)
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def _actual_user_counts(outer='user_id'):
+    return {
+        'posts_count': _subcount(Post, 'author', outer),
+        'followers_count': _subcount(Follow, 'author', outer),
+        'following_count': _subcount(Follow, 'user', outer),
+    }
+
+
+def _create_stats(user_id):
+    counts = User.objects.filter(pk=user_id).values(
+        **_actual_user_counts(outer='pk')
+    ).first()
+    if counts is None:
+        return
+    try:
+        with transaction.atomic():
+            UserStats.objects.create(user_id=user_id, **counts)
+    except IntegrityError:
+        pass
+
+
+def change_user_counter(user_id, field, delta):
+    """
+    Атомарно сдвигает счётчик пользователя. Недостающая строка
+    счётчиков создаётся из реальных значений только при увеличении:
+    при уменьшении пользователь может удаляться каскадом.
+    """
+    updated = UserStats.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta}
+    )
+    if not updated and delta > 0:
+        _create_stats(user_id)
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+FEED_COUNT_TIMEOUT = 10 * 60
+
+
+def _feed_count_key(scope):
+    return f'feed_count:{scope}'
+
+
+def feed_count(scope, queryset):
+    """
+    Число постов ленты из кеша; COUNT(*) только при промахе.
+    """
+    return cache.get_or_set(_feed_count_key(scope), queryset.count,
+                            FEED_COUNT_TIMEOUT)
+
+
+def reset_feed_counts(*scopes):
+    """
+    Сбрасывает кешированные числа постов лент, например после массовой
+    загрузки без сигналов.
+    """
+    cache.delete_many([_feed_count_key(scope) for scope in scopes])
+
+
+def change_feed_counts(delta, *group_ids):
+    scopes = [versions.GLOBAL] + [versions.group_scope(pk)
+                                  for pk in group_ids if pk]
+    for scope in scopes:
+        try:
+            cache.incr(_feed_count_key(scope), delta)
+        except ValueError:
+            # Счётчика нет в кеше: его посчитают при следующем чтении.
+            pass
+
+
+def recount():
+    """
+    Пересчитывает все счётчики по исходным таблицам и возвращает
+    число исправленных строк по каждому виду счётчиков.
+    """
+    missing = User.objects.filter(stats__isnull=True).values_list(
+        'pk', flat=True
+    )
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=pk) for pk in missing.iterator()]
+    )
+
+    actual = _actual_user_counts()
+    drifted = UserStats.objects.annotate(
+        **{f'actual_{name}': value for name, value in actual.items()}
+    ).exclude(
+        Q(posts_count=F('actual_posts_count'))
+        & Q(followers_count=F('actual_followers_count'))
+        & Q(following_count=F('actual_following_count'))
+    ).values_list('pk', flat=True)
+    users = UserStats.objects.filter(pk__in=list(drifted)).update(**actual)
+
+    actual_comments = _subcount(Comment, 'post', 'pk')
+    drifted = Post.objects.annotate(
+        actual_comment_count=actual_comments
+    ).exclude(
+        comment_count=F('actual_comment_count')
+    ).values_list('pk', flat=True)
+    posts = Post.objects.filter(pk__in=list(drifted)).update(
+        comment_count=actual_comments
+    )
+    return {'users': users, 'posts': posts}
@@ -0,0 +1,149 @@
+"""
+Журнал событий о новых постах и комментариях для живых обновлений.
+
+Сигналы post_save пишут событие в таблицу events файла SQLite из
+EVENTS_LOCATION. Так события видят все воркеры, в том числе те, что
+держат соединения Server-Sent Events (yatube.asgi). Id строки служит id
+события, и переподключившийся клиент дочитывает пропущенное по
+Last-Event-ID. Записи старше EVENTS_RETENTION секунд удаляются.
+
+Каналы события: feed (вся лента), group:<id>, author:<id> для постов и
+post:<id> для комментариев.
+"""
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from yatube.utils import LocalSQLite
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channels TEXT NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_created ON events (created);
+"""
+PRUNE_EVERY = 100
+
+FEED = 'feed'
+
+
+def group_channel(group_id):
+    return f'group:{group_id}'
+
+
+def author_channel(user_id):
+    return f'author:{user_id}'
+
+
+def post_channel(post_id):
+    return f'post:{post_id}'
+
+
+class Relay:
+    """
+    Таблица событий в файле SQLite, общая для всех процессов.
+    """
+
+    def __init__(self, path, retention=3600):
+        self.path = path
+        self.retention = retention
+        self._sqlite = LocalSQLite(path, SCHEMA, on_connect=self._reset_local)
+        self._local = self._sqlite.local
+
+    @property
+    def _db(self):
+        return self._sqlite.db
+
+    def _reset_local(self, local):
+        local.published = 0
+
+    def publish(self, channels, event, data):
+        db = self._db
+        db.execute(
+            'INSERT INTO events (channels, event, data, created) '
+            'VALUES (?, ?, ?, ?)',
+            (' '.join(channels), event,
+             json.dumps(data, cls=DjangoJSONEncoder), time.time())
+        )
+        self._local.published += 1
+        if self._local.published >= PRUNE_EVERY:
+            self._local.published = 0
+            self.prune()
+
+    def read_after(self, last_id, limit=1000):
+        """
+        События с id больше last_id: кортежи (id, каналы, тип, data).
+        """
+        rows = self._db.execute(
+            'SELECT id, channels, event, data FROM events WHERE id > ? '
+            'ORDER BY id LIMIT ?', (last_id, limit)
+        ).fetchall()
+        return [(pk, channels.split(), event, data)
+                for pk, channels, event, data in rows]
+
+    def last_id(self):
+        return self._db.execute(
+            'SELECT COALESCE(MAX(id), 0) FROM events'
+        ).fetchone()[0]
+
+    def prune(self):
+        self._db.execute('DELETE FROM events WHERE created < ?',
+                         (time.time() - self.retention,))
+
+
+_relays = {}
+_relays_lock = threading.Lock()
+
+
+def get_relay():
+    path = settings.EVENTS_LOCATION
+    with _relays_lock:
+        if path not in _relays:
+            _relays[path] = Relay(
+                path, getattr(settings, 'EVENTS_RETENTION', 3600)
+            )
+        return _relays[path]
+
+
+def is_enabled():
+    return bool(getattr(settings, 'EVENTS_LOCATION', None))
+
+
+def publish(channels, event, data):
+    """
+    Публикует событие после фиксации транзакции, чтобы клиенты не
+    узнали о записи, которая откатится.
+    """
+    relay = get_relay()
+    transaction.on_commit(lambda: relay.publish(channels, event, data))
+
+
+def publish_post(post):
+    channels = [FEED, author_channel(post.author_id)]
+    if post.group_id:
+        channels.append(group_channel(post.group_id))
+    publish(channels, 'post', {
+        'id': post.pk,
+        'author': post.author.username,
+        'group': post.group_id,
+        'text': post.text,
+        'pub_date': post.pub_date,
+    })
+
+
+def publish_comment(comment):
+    publish([post_channel(comment.post_id)], 'comment', {
+        'id': comment.pk,
+        'post': comment.post_id,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created': comment.created,
+    })
@@ -0,0 +1,100 @@
+"""
+Потоковая выгрузка данных в NDJSON или CSV.
+
+Строки читаются через values() и iterator(), поэтому экземпляры моделей
+не создаются, а память не растёт с объёмом данных. Формат совпадает с
+тем, что принимает команда import_data.
+"""
+import csv
+import json
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+CHUNK_SIZE = 2000
+FORMATS = ('jsonl', 'csv')
+CONTENT_TYPES = {'jsonl': 'application/x-ndjson', 'csv': 'text/csv'}
+
+# Модель -> (queryset, {колонка выгрузки: поле values()}).
+# Пароли пользователей не выгружаются.
+SOURCES = {
+    'user': (User.objects, {
+        'username': 'username',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'email': 'email',
+    }),
+    'group': (Group.objects, {
+        'title': 'title',
+        'slug': 'slug',
+        'description': 'description',
+    }),
+    'post': (Post.objects, {
+        'id': 'id',
+        'text': 'text',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'pub_date': 'pub_date',
+        'image': 'image',
+    }),
+    'comment': (Comment.objects, {
+        'id': 'id',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }),
+    'follow': (Follow.objects, {
+        'user': 'user__username',
+        'author': 'author__username',
+    }),
+}
+MODELS = tuple(SOURCES)
+
+
+def rows(model):
+    queryset, columns = SOURCES[model]
+    values = queryset.order_by('pk').values_list(*columns.values())
+    for row in values.iterator(chunk_size=CHUNK_SIZE):
+        yield dict(zip(columns, (
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        )))
+
+
+class Echo:
+    """
+    Файлоподобный объект для csv.writer: возвращает строку вместо записи.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_jsonl(models):
+    for model in models:
+        for row in rows(model):
+            yield json.dumps(dict(model=model, **row),
+                             ensure_ascii=False) + '\n'
+
+
+def export_csv(model):
+    writer = csv.writer(Echo())
+    yield writer.writerow(SOURCES[model][1])
+    for row in rows(model):
+        yield writer.writerow(row.values())
+
+
+def export(models, file_format='jsonl'):
+    """
+    Генератор строк выгрузки. CSV поддерживает только одну модель.
+    """
+    if file_format == 'csv':
+        if len(models) != 1:
+            raise ValueError('В CSV выгружается одна модель')
+        return export_csv(models[0])
+    return export_jsonl(models)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания, промахи и вытеснения для каждого кеша'
+
+    def handle(self, *args, **options):
+        for name in settings.CACHES:
+            cache = caches[name]
+            if not hasattr(cache, 'stats'):
+                self.stdout.write(f'{name}: бэкенд не считает статистику')
+                continue
+            stats = cache.stats()
+            lookups = stats['hits'] + stats['misses']
+            ratio = stats['hits'] / lookups if lookups else 0
+            self.stdout.write(
+                f'{name}: ' + ', '.join(f'{key} {value}'
+                                        for key, value in stats.items())
+                + f', hit ratio {ratio:.1%}'
+            )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, MODELS, export
+
+
+class Command(BaseCommand):
+    help = 'Выгружает данные в NDJSON или CSV потоком, без загрузки моделей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', choices=MODELS,
+                            help='Модель; можно указать несколько раз, '
+                                 'по умолчанию все')
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument('--output', help='Файл; по умолчанию stdout')
+
+    def handle(self, *args, **options):
+        models = options['model'] or list(MODELS)
+        try:
+            lines = export(models, options['format'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            output.writelines(lines)
@@ -0,0 +1,63 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.bulk import BATCH_SIZE, MODELS, Importer
+
+
+def read_jsonl(stream, model):
+    for line in stream:
+        if line.strip():
+            record = json.loads(line)
+            yield record.pop('model', model), record
+
+
+def read_csv(stream, model):
+    for record in csv.DictReader(stream):
+        yield model, record
+
+
+class Command(BaseCommand):
+    help = ('Загружает пользователей, группы, посты, комментарии и подписки '
+            'из JSONL или CSV пачками bulk_create')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с данными или «-» для stdin')
+        parser.add_argument('--format', choices=('jsonl', 'csv'),
+                            help='По умолчанию определяется по расширению')
+        parser.add_argument('--model', choices=MODELS,
+                            help='Модель записей; для CSV обязательна, '
+                                 'в JSONL можно указать поле model')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        if file_format == 'csv' and not options['model']:
+            raise CommandError('Для CSV укажите --model')
+        reader = read_csv if file_format == 'csv' else read_jsonl
+
+        importer = Importer(batch_size=options['batch_size'])
+        stream = (sys.stdin if path == '-'
+                  else open(path, encoding='utf-8', newline=''))
+        try:
+            for number, (model, record) in enumerate(
+                    reader(stream, options['model']), 1):
+                try:
+                    importer.add(model, record)
+                except (KeyError, TypeError, ValueError) as error:
+                    raise CommandError(f'Запись {number}: {error!r}')
+            try:
+                loaded = importer.finish()
+            except ValueError as error:
+                raise CommandError(f'Конец файла: {error!r}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(', '.join(f'{model}: {count}'
+                                    for model, count in loaded.items()))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс постов'
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        backend.rebuild()
+        self.stdout.write(
+            f'Индекс перестроен: {backend.__class__.__name__}'
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики и чинит расхождения'
+
+    def handle(self, *args, **options):
+        repaired = counters.recount()
+        self.stdout.write(
+            f'Исправлено счётчиков пользователей: {repaired["users"]}, '
+            f'постов: {repaired["posts"]}'
+        )
@@ -0,0 +1,62 @@
+# Generated by Django 2.2.28 on 2026-10-18 02:56
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+
+    def counts(queryset, field):
+        return dict(queryset.order_by().values_list(field)
+                    .annotate(n=Count('pk')))
+
+    posts = counts(Post.objects, 'author')
+    followers = counts(Follow.objects, 'author')
+    following = counts(Follow.objects, 'user')
+    UserStats.objects.bulk_create([
+        UserStats(user_id=pk,
+                  posts_count=posts.get(pk, 0),
+                  followers_count=followers.get(pk, 0),
+                  following_count=following.get(pk, 0))
+        for pk in User.objects.values_list('pk', flat=True).iterator()
+    ])
+    for post_id, n in counts(Comment.objects, 'post').items():
+        Post.objects.filter(pk=post_id).update(comment_count=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0009_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Записей')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Подписок')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Счётчики пользователя',
+                'verbose_name_plural': 'Счётчики пользователей',
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
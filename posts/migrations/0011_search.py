@@ -0,0 +1,82 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:00
+
+import re
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+# Тот же разбор на слова, что и posts.search.tokenize.
+WORD = re.compile(r'\w+')
+TERM_LENGTH = 64
+
+
+def fill_search_terms(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    SearchTerm = apps.get_model('posts', 'SearchTerm')
+    db_alias = schema_editor.connection.alias
+    terms = []
+    for post in Post.objects.using(db_alias).only('text').iterator(
+            chunk_size=2000):
+        words = [word[:TERM_LENGTH]
+                 for word in WORD.findall(post.text.lower())]
+        terms.extend(
+            SearchTerm(term=term, post_id=post.pk, weight=weight)
+            for term, weight in Counter(words).items()
+        )
+        if len(terms) >= 2000:
+            SearchTerm.objects.using(db_alias).bulk_create(terms)
+            terms = []
+    SearchTerm.objects.using(db_alias).bulk_create(terms)
+
+
+def create_fts_table(apps, schema_editor):
+    # FTS5 есть только в SQLite, и то не в каждой сборке; без неё
+    # поиск работает через инвертированный индекс SearchTerm, который
+    # здесь же заполняется для уже написанных постов. Если при FTS5
+    # явно выбран POSTS_SEARCH_BACKEND = 'inverted', индекс строит
+    # manage.py rebuild_search_index.
+    if schema_editor.connection.vendor != 'sqlite':
+        fill_search_terms(apps, schema_editor)
+        return
+    try:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE posts_post_fts USING fts5("
+            "text, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except OperationalError:
+        fill_search_terms(apps, schema_editor)
+        return
+    schema_editor.execute(
+        'INSERT INTO posts_post_fts (rowid, text) '
+        'SELECT id, text FROM posts_post'
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS posts_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Термин')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Частота')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='posts.Post')),
+            ],
+            options={
+                'unique_together': {('term', 'post')},
+            },
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -13,28 +13,81 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """
+        Посты для ленты: автор и группа одним JOIN, чтобы карточка
+        поста не делала запросов (число комментариев хранится в посте).
+        """
+        return self.select_related('author', 'group')
+
+    _known_count = None
+
+    def with_count(self, count):
+        """
+        Копия с заранее известным числом строк: Paginator возьмёт его
+        из count() вместо запроса COUNT(*).
+        """
+        clone = self._chain()
+        clone._known_count = count
+        return clone
+
+    def count(self):
+        if self._known_count is not None:
+            return self._known_count
+        return super().count()
+
+
+# Поля Post, которые обновляют только счётчики.
+COUNTERS = ('comment_count',)
+
+
 class Post(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField("date published", auto_now_add=True)
+    # Одиночные индексы внешних ключей заменяют составные из Meta.indexes.
     author = models.ForeignKey(User, on_delete=models.CASCADE,
-                               related_name="posts")
+                               related_name="posts", db_index=False)
     group = models.ForeignKey(Group, on_delete=models.PROTECT,
                               blank=True, null=True,
-                              related_name='posts')
+                              related_name='posts', db_index=False)
     image = models.ImageField(upload_to='posts/', blank=True, null=True)
+    comment_count = models.PositiveIntegerField('Комментариев', default=0,
+                                                editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = 'Посты'
         verbose_name = 'Пост'
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(fields=['author', 'pub_date'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', 'pub_date'],
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=['pub_date', 'id'],
+                         name='post_pub_date_id_idx'),
+        ]
 
     def __str__(self):
         return self.text[:10]
 
+    def save(self, *args, **kwargs):
+        # comment_count меняется только через F() в counters. Обычное
+        # сохранение загруженного раньше поста (форма, админка) не должно
+        # перезаписать его значением из памяти.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTERS
+            ]
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE,
-                             related_name='comments')
+                             related_name='comments', db_index=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                related_name='comments')
     created = models.DateTimeField('date published', auto_now_add=True,
@@ -43,6 +96,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = [
+            models.Index(fields=['post', 'created'],
+                         name='comment_post_created_idx'),
+        ]
 
 
 class Follow(models.Model):
@@ -54,3 +111,41 @@ class Follow(models.Model):
     class Meta:
         ordering = ["-pub_date"]
         unique_together = ["user", "author"]
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+                                related_name='stats')
+    posts_count = models.PositiveIntegerField('Записей', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+
+    class Meta:
+        verbose_name_plural = 'Счётчики пользователей'
+        verbose_name = 'Счётчики пользователя'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='timeline')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='timeline_entries')
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date']
+        unique_together = ['user', 'post']
+        indexes = [
+            models.Index(fields=['user', '-pub_date'],
+                         name='timeline_user_pub_date_idx'),
+        ]
+
+
+class SearchTerm(models.Model):
+    term = models.CharField('Термин', max_length=64)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='search_terms')
+    weight = models.PositiveIntegerField('Частота', default=1)
+
+    class Meta:
+        unique_together = ['term', 'post']
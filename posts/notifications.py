@@ -0,0 +1,36 @@
+"""
+Письма авторам о новых подписчиках и комментариях.
+
+Письма уходят через очередь задач (jobs), а не в запросе, поэтому
+медленный почтовый сервер не задерживает ответ пользователю.
+"""
+from django.conf import settings
+
+from jobs.mail import send_email
+
+
+def is_enabled():
+    return getattr(settings, 'POSTS_EMAIL_NOTIFICATIONS', True)
+
+
+def new_follower(follow):
+    author = follow.author
+    if not author.email:
+        return
+    send_email.delay(
+        subject='Новый подписчик',
+        message=f'{follow.user.username} подписался на ваши записи',
+        recipients=[author.email],
+    )
+
+
+def new_comment(comment):
+    author = comment.post.author
+    if not author.email or author.pk == comment.author_id:
+        return
+    send_email.delay(
+        subject='Новый комментарий',
+        message=f'{comment.author.username} прокомментировал вашу запись: '
+                f'{comment.text}',
+        recipients=[author.email],
+    )
@@ -0,0 +1,112 @@
+"""
+Кеш целых страниц для анонимных посетителей.
+
+Страница хранится в кеше сжатой gzip под ключом из адреса, номера
+страницы (или курсора) и версий лент из versions. Сигналы Post и Comment
+увеличивают версии, поэтому после изменения ключ и ETag становятся
+новыми. ETag вычисляется из ключа без рендера, и условный запрос
+получает 304 до вызова представления. Сжатый и несжатый ответы —
+разные представления страницы, поэтому у сжатого к ETag добавляется
+-gzip, как у mod_deflate. Last-Modified — время рендера страницы:
+правка поста не меняет его pub_date, а новая версия ленты всегда
+рендерится позже старой.
+"""
+import gzip
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import versions
+
+PAGE_TIMEOUT = 15 * 60
+# Параметры запроса, от которых зависит страница; остальные не
+# попадают в ключ, чтобы ими нельзя было раздуть кеш.
+PAGE_PARAMS = ('page', 'cursor')
+
+
+def _page_key(request, scopes):
+    params = [request.GET.get(name, '') for name in PAGE_PARAMS]
+    raw = '\n'.join([request.path, *params, versions.cache_version(*scopes)])
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _accepts_gzip(request):
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+def _cached_response(request, entry, etag):
+    body, content_type, last_modified = entry
+    response = HttpResponse(content_type=content_type)
+    if _accepts_gzip(request):
+        response.content = body
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response.content = gzip.decompress(body)
+    _set_validators(response, etag, last_modified)
+    return response
+
+
+def _set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'max-age=0'
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+
+def _cacheable(request, response):
+    return (response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED'))
+
+
+def anonymous_page_cache(scopes):
+    """
+    Кеширует страницу для анонимов. scopes(**kwargs) — версии
+    лент страницы или None, если страницы нет.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') \
+                    or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            page_scopes = scopes(**kwargs)
+            if page_scopes is None:
+                return view(request, *args, **kwargs)
+
+            key = _page_key(request, page_scopes)
+            etag = f'"{key}-gzip"' if _accepts_gzip(request) else f'"{key}"'
+            entry = cache.get(f'page:{key}')
+            last_modified = entry[2] if entry else None
+            conditional = get_conditional_response(
+                request, etag=etag,
+                # В заголовке время с точностью до секунды.
+                last_modified=last_modified
+                and int(last_modified.timestamp()),
+            )
+            if conditional is not None:
+                return conditional
+            if entry is not None:
+                return _cached_response(request, entry, etag)
+
+            response = view(request, *args, **kwargs)
+            if _cacheable(request, response):
+                entry = (
+                    gzip.compress(response.content),
+                    response['Content-Type'],
+                    timezone.now(),
+                )
+                cache.set(f'page:{key}', entry, PAGE_TIMEOUT)
+                if _accepts_gzip(request):
+                    return _cached_response(request, entry, etag)
+                _set_validators(response, etag, entry[2])
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+PER_PAGE = 10
+COMMENTS_PER_PAGE = 50
+
+
+def encode_cursor(direction, pub_date, pk):
+    """
+    Упаковывает позицию в ленте в непрозрачный токен для URL.
+    """
+    raw = json.dumps([direction, pub_date.isoformat(), pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Распаковывает токен курсора, для битого токена возвращает None.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, pub_date, pk = json.loads(
+            base64.urlsafe_b64decode(padded.encode()).decode()
+        )
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if direction not in ('next', 'prev') or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class CursorPage:
+    """
+    Страница ленты, построенная по ключу (pub_date, id) без OFFSET.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, cursor, has_next, has_previous):
+        self.object_list = object_list
+        self.cursor = cursor
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        last = self.object_list[-1]
+        return encode_cursor('next', last.pub_date, last.pk)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        first = self.object_list[0]
+        return encode_cursor('prev', first.pub_date, first.pk)
+
+
+class CursorPaginator:
+    """
+    Паджинатор по ключу (pub_date, id), повторяющий Post.Meta.ordering.
+
+    Каждая страница — один запрос по индексу с LIMIT, без COUNT(*)
+    и без OFFSET, поэтому глубина страницы не влияет на её стоимость.
+    """
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    @cached_property
+    def count(self):
+        return self.object_list.count()
+
+    def get_page(self, cursor):
+        position = decode_cursor(cursor)
+        if position is None:
+            return self._forward(None, None)
+        direction, pub_date, pk = position
+        if direction == 'prev':
+            return self._backward(cursor, pub_date, pk)
+        return self._forward(cursor, (pub_date, pk))
+
+    def forward_queryset(self, position=None):
+        """
+        Запрос страницы после позиции (pub_date, id), на одну строку
+        больше, чтобы узнать, есть ли следующая страница.
+        """
+        queryset = self.object_list.order_by('-pub_date', '-id')
+        if position is not None:
+            pub_date, pk = position
+            queryset = queryset.filter(pub_date__lte=pub_date).filter(
+                Q(pub_date__lt=pub_date) | Q(id__lt=pk)
+            )
+        return queryset[:self.per_page + 1]
+
+    def backward_queryset(self, position):
+        pub_date, pk = position
+        queryset = self.object_list.order_by('pub_date', 'id').filter(
+            pub_date__gte=pub_date
+        ).filter(Q(pub_date__gt=pub_date) | Q(id__gt=pk))
+        return queryset[:self.per_page + 1]
+
+    def _forward(self, cursor, position):
+        rows = list(self.forward_queryset(position))
+        return CursorPage(rows[:self.per_page], cursor,
+                          has_next=len(rows) > self.per_page,
+                          has_previous=position is not None)
+
+    def _backward(self, cursor, pub_date, pk):
+        rows = list(self.backward_queryset((pub_date, pk)))
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(rows, cursor,
+                          has_next=True, has_previous=has_previous)
+
+
+def page_window(page, on_each_side=2, on_ends=1):
+    """
+    Номера страниц вокруг текущей и на краях; None — пропуск «…».
+    Размер списка не зависит от числа страниц.
+    """
+    last = page.paginator.num_pages
+    window = set(range(max(1, page.number - on_each_side),
+                       min(last, page.number + on_each_side) + 1))
+    window.update(range(1, min(last, on_ends) + 1))
+    window.update(range(max(1, last - on_ends + 1), last + 1))
+    numbers = []
+    for number in sorted(window):
+        if numbers and number - numbers[-1] > 1:
+            numbers.append(None)
+        numbers.append(number)
+    return numbers
+
+
+def comments_after(comments, cursor=None, per_page=COMMENTS_PER_PAGE):
+    """
+    Комментарии по порядку (created, id) после курсора, по индексу
+    (post, created). Возвращает пару (комментарии, курсор следующей
+    порции или None).
+    """
+    queryset = comments.order_by('created', 'id')
+    position = decode_cursor(cursor)
+    if position is not None:
+        _, created, pk = position
+        queryset = queryset.filter(created__gte=created).filter(
+            Q(created__gt=created) | Q(id__gt=pk)
+        )
+    rows = list(queryset[:per_page + 1])
+    if len(rows) <= per_page:
+        return rows, None
+    last = rows[per_page - 1]
+    return rows[:per_page], encode_cursor('next', last.created, last.pk)
+
+
+def paginate(request, post_list, per_page=PER_PAGE):
+    """
+    Возвращает пару (paginator, page) для ленты постов.
+
+    Курсорная паджинация включается настройкой POSTS_CURSOR_PAGINATION
+    или параметром ?cursor= в запросе, иначе используется обычный
+    Paginator с номерами страниц.
+    """
+    cursor = request.GET.get('cursor')
+    if cursor is not None or getattr(settings,
+                                     'POSTS_CURSOR_PAGINATION', False):
+        paginator = CursorPaginator(post_list, per_page)
+        return paginator, paginator.get_page(cursor)
+    paginator = Paginator(post_list, per_page)
+    return paginator, paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,151 @@
+"""
+Полнотекстовый поиск по Post.text.
+
+На SQLite используется виртуальная таблица FTS5 (posts_post_fts),
+на остальных базах — инвертированный индекс SearchTerm, который
+строится на Python. Оба индекса обновляются сигналами Post.
+"""
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, Count, F, FloatField, Sum, When
+
+from .models import Post, SearchTerm
+
+FTS_TABLE = 'posts_post_fts'
+MAX_RESULTS = 1000
+TERM_LENGTH = SearchTerm._meta.get_field('term').max_length
+
+_word = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return [word[:TERM_LENGTH] for word in _word.findall(text.lower())]
+
+
+class FTS5Backend:
+    """
+    Поиск через SQLite FTS5 с ранжированием bm25.
+    """
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                           [post.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+                [post.pk, post.text],
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                           [post_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                f'SELECT id, text FROM posts_post'
+            )
+
+    def search(self, query, limit=MAX_RESULTS):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = ' '.join('"{}"'.format(term) for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s',
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndexBackend:
+    """
+    Инвертированный индекс в таблице SearchTerm для любых баз:
+    термин -> (пост, частота), ранжирование tf-idf.
+    """
+
+    def index(self, post):
+        self.remove(post.pk)
+        SearchTerm.objects.bulk_create([
+            SearchTerm(term=term, post_id=post.pk, weight=weight)
+            for term, weight in Counter(tokenize(post.text)).items()
+        ])
+
+    def remove(self, post_id):
+        SearchTerm.objects.filter(post_id=post_id).delete()
+
+    def rebuild(self):
+        SearchTerm.objects.all().delete()
+        for post in Post.objects.only('text').iterator(chunk_size=2000):
+            self.index(post)
+
+    def search(self, query, limit=MAX_RESULTS):
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        frequencies = dict(
+            SearchTerm.objects.filter(term__in=terms).order_by()
+            .values_list('term').annotate(n=Count('id'))
+        )
+        if len(frequencies) < len(terms):
+            return []
+        total = cache.get_or_set('search:post_total',
+                                 Post.objects.count, 60 * 60) or 1
+        score = Sum(Case(
+            *[When(term=term,
+                   then=F('weight') * math.log(1 + total / frequency))
+              for term, frequency in frequencies.items()],
+            output_field=FloatField(),
+        ))
+        return list(
+            SearchTerm.objects.filter(term__in=terms).order_by()
+            .values('post_id')
+            .annotate(matched=Count('id'), score=score)
+            .filter(matched=len(terms))
+            .order_by('-score', '-post_id')
+            .values_list('post_id', flat=True)[:limit]
+        )
+
+
+_fts_tables = {}
+
+
+def _fts_available():
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if name not in _fts_tables:
+        _fts_tables[name] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[name]
+
+
+def get_backend():
+    """
+    Бэкенд по настройке POSTS_SEARCH_BACKEND: 'fts5', 'inverted'
+    или 'auto' (FTS5, если таблица есть).
+    """
+    name = getattr(settings, 'POSTS_SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        name = 'fts5' if _fts_available() else 'inverted'
+    if name == 'fts5':
+        return FTS5Backend()
+    return InvertedIndexBackend()
+
+
+def search_posts(query, limit=MAX_RESULTS):
+    """
+    Идентификаторы постов по запросу, от самых релевантных.
+    """
+    return get_backend().search(query, limit)
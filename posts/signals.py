@@ -0,0 +1,153 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import (counters, events, notifications, search, timeline,
+               versions)
+from .models import Comment, Follow, Post, User, UserStats
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created and timeline.is_enabled():
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Post)
+def publish_new_post(sender, instance, created, **kwargs):
+    if created and events.is_enabled():
+        events.publish_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def publish_new_comment(sender, instance, created, **kwargs):
+    if created and events.is_enabled():
+        events.publish_comment(instance)
+
+
+@receiver(post_save, sender=Follow)
+def notify_new_follower(sender, instance, created, **kwargs):
+    if created and notifications.is_enabled():
+        notifications.new_follower(instance)
+
+
+@receiver(post_save, sender=Comment)
+def notify_new_comment(sender, instance, created, **kwargs):
+    if created and notifications.is_enabled():
+        notifications.new_comment(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created and timeline.is_enabled():
+        timeline.backfill(instance.user, instance.author)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline(sender, instance, **kwargs):
+    if timeline.is_enabled():
+        timeline.prune(instance.user, instance.author)
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user_counter(instance.author_id, 'posts_count', 1)
+        counters.change_feed_counts(1, instance.group_id)
+        return
+    old_group_id = getattr(instance, '_old_group_id', None)
+    if old_group_id != instance.group_id:
+        counters.change_feed_counts(-1, old_group_id)
+        counters.change_feed_counts(1, instance.group_id)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.change_user_counter(instance.author_id, 'posts_count', -1)
+    counters.change_feed_counts(-1, instance.group_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user_counter(instance.author_id,
+                                     'followers_count', 1)
+        counters.change_user_counter(instance.user_id,
+                                     'following_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    counters.change_user_counter(instance.author_id, 'followers_count', -1)
+    counters.change_user_counter(instance.user_id, 'following_count', -1)
+    if timeline.is_enabled():
+        followers = UserStats.objects.filter(
+            user_id=instance.author_id
+        ).values_list('followers_count', flat=True).first()
+        if followers == timeline.celebrity_threshold():
+            # Автор только что опустился до порога знаменитости.
+            timeline.restore_author.delay(author_id=instance.author_id)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    instance._old_group_id = None
+    if instance.pk:
+        instance._old_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_versions(sender, instance, **kwargs):
+    versions.bump(*versions.post_scopes(
+        instance.pk, instance.author_id,
+        instance.group_id, getattr(instance, '_old_group_id', None),
+    ))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_versions(sender, instance, **kwargs):
+    post = Post.objects.filter(pk=instance.post_id).values(
+        'author_id', 'group_id'
+    ).first()
+    if post is None:
+        return
+    versions.bump(*versions.post_scopes(
+        instance.post_id, post['author_id'], post['group_id'],
+    ))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def bump_follow_versions(sender, instance, **kwargs):
+    versions.bump(versions.author_scope(instance.author_id),
+                  versions.author_scope(instance.user_id))
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    search.get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.get_backend().remove(instance.pk)
@@ -0,0 +1,155 @@
+"""
+Кеш лент без лавины пересчётов (cache stampede).
+
+Вместе со значением хранится срок свежести и время вычисления. После
+срока свежести значение ещё STALE_TIMEOUT секунд отдаётся как есть, а
+пересчёт уходит в фоновый поток; запускает его только один запрос
+(блокировка через cache.add). Незадолго до срока свежести пересчёт
+может начаться досрочно с вероятностью, растущей к концу срока
+(алгоритм XFetch), поэтому популярные ключи обычно не устаревают вовсе.
+
+Если значения нет совсем, одновременные промахи ждут одно вычисление:
+в процессе — общий Future, между процессами — блокировку в кеше.
+"""
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from yatube.utils import LazyExecutor
+
+logger = logging.getLogger(__name__)
+
+STALE_TIMEOUT = 15 * 60
+LOCK_TIMEOUT = 30
+WAIT_TIMEOUT = 5
+POLL_INTERVAL = 0.05
+# Чем больше BETA, тем раньше начинается досрочный пересчёт.
+BETA = 1.0
+
+_executor = LazyExecutor('FEED_CACHE_WORKERS', 2, 'feed-cache')
+_lock = threading.Lock()
+_refreshing = set()
+_computing = {}
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _store(key, value, duration, timeout):
+    cache.set(key, (value, time.time() + timeout, duration),
+              timeout + STALE_TIMEOUT)
+
+
+def _compute_and_store(key, compute, timeout):
+    start = time.perf_counter()
+    value = compute()
+    _store(key, value, time.perf_counter() - start, timeout)
+    return value
+
+
+def _is_fresh(fresh_until, duration):
+    # XFetch: -log(u) для u из (0, 1] — случайная добавка к текущему
+    # времени, в среднем равная времени вычисления.
+    early = duration * BETA * -math.log(1 - random.random())
+    return time.time() + early < fresh_until
+
+
+def _refresh(key, compute, timeout):
+    try:
+        _compute_and_store(key, compute, timeout)
+    except Exception:
+        logger.exception('Не удалось обновить кеш %s', key)
+    finally:
+        cache.delete(_lock_key(key))
+        with _lock:
+            _refreshing.discard(key)
+
+
+def _work(key, compute, timeout):
+    try:
+        _refresh(key, compute, timeout)
+    finally:
+        connection.close()
+
+
+def _schedule_refresh(key, compute, timeout):
+    with _lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    if not cache.add(_lock_key(key), 1, LOCK_TIMEOUT):
+        with _lock:
+            _refreshing.discard(key)
+        return
+    if getattr(settings, 'FEED_CACHE_ASYNC', True):
+        _executor.submit(_work, key, compute, timeout)
+    else:
+        _refresh(key, compute, timeout)
+
+
+def _wait_for_other_process(key):
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if not cache.get(_lock_key(key)):
+            break
+    return None
+
+
+def _compute_coalesced(key, compute, timeout):
+    with _lock:
+        future = _computing.get(key)
+        owner = future is None
+        if owner:
+            future = _computing[key] = Future()
+    if not owner:
+        try:
+            return future.result(WAIT_TIMEOUT)
+        except Exception:
+            return compute()
+
+    try:
+        value = None
+        locked = cache.add(_lock_key(key), 1, LOCK_TIMEOUT)
+        if not locked:
+            value = _wait_for_other_process(key)
+        if value is None:
+            try:
+                value = _compute_and_store(key, compute, timeout)
+            finally:
+                if locked:
+                    cache.delete(_lock_key(key))
+        future.set_result(value)
+        return value
+    except Exception as error:
+        future.set_exception(error)
+        raise
+    finally:
+        with _lock:
+            _computing.pop(key, None)
+
+
+def get_or_compute(key, compute, timeout, refresh=None):
+    """
+    Значение из кеша или compute(). Устаревшее значение пересчитывается
+    в фоне функцией refresh (по умолчанию compute): она не должна
+    зависеть от объектов текущего запроса, которые он ещё меняет.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return _compute_coalesced(key, compute, timeout)
+    value, fresh_until, duration = entry
+    if not _is_fresh(fresh_until, duration):
+        _schedule_refresh(key, refresh or compute, timeout)
+    return value
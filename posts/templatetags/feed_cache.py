@@ -0,0 +1,68 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+from django.template.context import RenderContext
+from django.utils.safestring import mark_safe
+
+from posts import swr
+from posts.templatetags.post_cards import fill_edit_links
+
+register = template.Library()
+
+
+def detach(context):
+    """
+    Копия контекста для фонового рендера: запрос продолжает менять
+    свой контекст, пока фрагмент пересчитывается.
+    """
+    detached = context.new(context.flatten())
+    detached.render_context = RenderContext()
+    return detached
+
+
+class FeedCacheNode(template.Node):
+
+    def __init__(self, nodelist, timeout, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = int(self.timeout.resolve(context))
+        key = make_template_fragment_key(
+            self.fragment_name, [var.resolve(context) for var in self.vary_on]
+        )
+        detached = detach(context)
+        html = swr.get_or_compute(
+            key,
+            lambda: self._render_shared(context),
+            timeout,
+            refresh=lambda: self._render_shared(detached),
+        )
+        # Фрагмент общий для всех зрителей, ссылки автора — после кеша.
+        return mark_safe(fill_edit_links(html, context.get('user')))
+
+    def _render_shared(self, context):
+        with context.push(defer_edit_links=True):
+            return self.nodelist.render(context)
+
+
+@register.tag
+def feedcache(parser, token):
+    """
+    Как {% cache %}, но без лавины пересчётов: устаревший фрагмент
+    отдаётся, пока один запрос пересчитывает его в фоне.
+
+        {% feedcache 900 index_page cache_version page.number %}
+            ...
+        {% endfeedcache %}
+    """
+    nodelist = parser.parse(('endfeedcache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает таймаут и имя фрагмента"
+        )
+    return FeedCacheNode(nodelist, parser.compile_filter(bits[1]), bits[2],
+                         [parser.compile_filter(bit) for bit in bits[3:]])
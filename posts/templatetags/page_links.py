@@ -0,0 +1,26 @@
+from django import template
+
+from posts import pagination
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page):
+    """
+    Номера страниц для панели паджинатора, см. pagination.page_window.
+    """
+    return pagination.page_window(page)
+
+
+@register.simple_tag
+def comments_cursor(post, comments):
+    """
+    Курсор для кнопки «Показать ещё» или None, если показаны все
+    комментарии поста.
+    """
+    comments = list(comments)
+    if not comments or post.comment_count <= len(comments):
+        return None
+    last = comments[-1]
+    return pagination.encode_cursor('next', last.created, last.pk)
@@ -0,0 +1,78 @@
+import re
+
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from posts import thumbnails, versions
+
+register = template.Library()
+
+CARD_TIMEOUT = 60 * 60
+EDIT_LINK_SLOT = '<!--edit-link-->'
+# Слот с автором и адресом правки, который заполняется под зрителя.
+VIEWER_SLOT = '<!--edit-link:{author_id}:{url}-->'
+VIEWER_SLOT_RE = re.compile(r'<!--edit-link:(\d+):([^>]*)-->')
+
+
+def card_key(post, version):
+    return f'post_card:{post.pk}:{version}:{post.comment_count}'
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """
+    Выводит карточку поста из кеша. Карточка общая для всех лент и
+    зрителей, ссылка «Редактировать» для автора вставляется после
+    чтения из кеша. Внутри {% feedcache %} в карточке остаётся слот,
+    и ссылку вставляет уже feedcache после чтения фрагмента.
+    """
+    version, = versions.get_versions(versions.post_scope(post.pk))
+    key = card_key(post, version)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string('includes/post_card_body.html',
+                                {'post': post})
+        cache.set(key, html, CARD_TIMEOUT)
+
+    slot = VIEWER_SLOT.format(
+        author_id=post.author_id,
+        url=reverse('post_edit', args=[post.author.username, post.pk]),
+    )
+    html = html.replace(EDIT_LINK_SLOT, slot, 1)
+    if not context.get('defer_edit_links'):
+        html = fill_edit_links(html, context.get('user'))
+    return mark_safe(html)
+
+
+def fill_edit_links(html, user):
+    """
+    Заполняет слоты карточек: автору — ссылка «Редактировать»,
+    остальным — пусто.
+    """
+    viewer = user.pk if user is not None and user.is_authenticated else None
+
+    def link(match):
+        if int(match.group(1)) != viewer:
+            return ''
+        return format_html(
+            '<a class="btn btn-sm text-muted" href="{}" role="button">'
+            'Редактировать</a>', match.group(2),
+        )
+    return VIEWER_SLOT_RE.sub(link, html)
+
+
+@register.simple_tag
+def thumbnail_url(post, geometry):
+    """
+    Адрес готовой миниатюры; если её нет, нарезка ставится в очередь,
+    а шаблон показывает заглушку.
+    """
+    url = thumbnails.thumbnail_url(post.image, geometry)
+    if url is None and post.image:
+        thumbnails.queue(post)
+        url = thumbnails.thumbnail_url(post.image, geometry)
+    return url
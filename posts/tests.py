@@ -153,8 +153,10 @@ class TestCache(TestCase):
     def test_cache(self):
         self.second_client.get(reverse('index'))
         self.first_client.post(reverse('new-post'), {'text': 'Test text'})
+        # Версия ленты меняется при публикации, поэтому новый пост
+        # виден сразу, без ожидания таймаута кеша.
         response = self.second_client.get(reverse('index'))
-        self.assertNotContains(response, 'Test text')
+        self.assertContains(response, 'Test text')
 
 
 class TestFollowSystem(TestCase):
@@ -0,0 +1,96 @@
+"""
+Фоновая нарезка миниатюр для Post.image.
+
+new_post и post_edit ставят пост в очередь, локальный пул потоков
+нарезает все размеры, которые используют шаблоны, и запоминает адреса
+готовых миниатюр в кеше. Шаблон берёт адрес из кеша и, пока миниатюры
+нет, показывает заглушку, поэтому рендер ленты не работает с Pillow.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from sorl.thumbnail import get_thumbnail
+
+from yatube.utils import LazyExecutor
+
+from . import versions
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Размеры, которые используют шаблоны: геометрия и опции sorl.
+SIZES = {
+    '960x339': {'crop': 'center', 'upscale': True},
+}
+
+_executor = LazyExecutor('THUMBNAIL_WORKERS', 2, 'thumbnails')
+_lock = threading.Lock()
+_in_flight = set()
+
+
+def _ready_key(name, geometry):
+    return f'thumbnail:{geometry}:{name}'
+
+
+def thumbnail_url(image, geometry):
+    """
+    Адрес готовой миниатюры или None, если её ещё нет.
+    """
+    if not image:
+        return None
+    return cache.get(_ready_key(image.name, geometry))
+
+
+def generate(post_id):
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'author_id', 'group_id'
+    ).first()
+    if post is None or not post.image:
+        return
+    ready = {}
+    for geometry, options in SIZES.items():
+        thumbnail = get_thumbnail(post.image, geometry, **options)
+        ready[_ready_key(post.image.name, geometry)] = thumbnail.url
+    cache.set_many(ready, timeout=None)
+    versions.bump(*versions.post_scopes(post.pk, post.author_id,
+                                        post.group_id))
+
+
+def _generate_logged(post_id):
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception('Не удалось нарезать миниатюры поста %s', post_id)
+
+
+def _work(post_id):
+    try:
+        _generate_logged(post_id)
+    finally:
+        with _lock:
+            _in_flight.discard(post_id)
+        connection.close()
+
+
+def _submit(post_id):
+    with _lock:
+        if post_id in _in_flight:
+            return
+        _in_flight.add(post_id)
+    _executor.submit(_work, post_id)
+
+
+def queue(post):
+    """
+    Ставит нарезку миниатюр поста в очередь после коммита транзакции.
+    При THUMBNAIL_ASYNC = False миниатюры нарезаются сразу.
+    """
+    if not post.image:
+        return
+    if not getattr(settings, 'THUMBNAIL_ASYNC', True):
+        _generate_logged(post.pk)
+        return
+    transaction.on_commit(lambda: _submit(post.pk))
@@ -0,0 +1,146 @@
+"""
+Лента подписок с раздачей при записи (fan-out-on-write).
+
+Новый пост сразу раскладывается во «входящие» (TimelineEntry) всех
+подписчиков автора, и follow_index читает их одним диапазоном по индексу
+(user, pub_date). Авторы, у которых подписчиков больше
+POSTS_TIMELINE_CELEBRITY_FOLLOWERS, не раздаются: их посты подмешиваются
+в ленту при чтении.
+"""
+from django.conf import settings
+from django.db.models import Q
+
+from jobs.queue import task
+from .models import Follow, Post, TimelineEntry, UserStats
+
+BATCH_SIZE = 1000
+
+
+def is_enabled():
+    return getattr(settings, 'POSTS_TIMELINE_ENABLED', False)
+
+
+def celebrity_threshold():
+    return getattr(settings, 'POSTS_TIMELINE_CELEBRITY_FOLLOWERS', 1000)
+
+
+def is_celebrity(author):
+    followers = UserStats.objects.filter(user=author).values_list(
+        'followers_count', flat=True
+    ).first()
+    return (followers or 0) > celebrity_threshold()
+
+
+def _save(entries):
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def fan_out(post):
+    """
+    Раскладывает новый пост во входящие подписчиков автора.
+    """
+    if is_celebrity(post.author):
+        return
+    followers = Follow.objects.filter(
+        author=post.author
+    ).values_list('user_id', flat=True)
+    entries = []
+    for user_id in followers.iterator():
+        entries.append(TimelineEntry(user_id=user_id, post=post,
+                                     pub_date=post.pub_date))
+        if len(entries) >= BATCH_SIZE:
+            _save(entries)
+            entries = []
+    _save(entries)
+
+
+def backfill(user, author):
+    """
+    Добавляет во входящие пользователя посты автора, на которого он
+    только что подписался.
+    """
+    if is_celebrity(author):
+        return
+    posts = Post.objects.filter(author=author).values_list('id', 'pub_date')
+    entries = []
+    for post_id, pub_date in posts.iterator():
+        entries.append(TimelineEntry(user=user, post_id=post_id,
+                                     pub_date=pub_date))
+        if len(entries) >= BATCH_SIZE:
+            _save(entries)
+            entries = []
+    _save(entries)
+
+
+@task
+def restore_author(author_id):
+    """
+    Раскладывает посты автора во входящие всех подписчиков, когда он
+    перестал быть «знаменитостью»: его посты больше не подмешиваются
+    при чтении, а написанные в статусе знаменитости не были разданы.
+    Постов × подписчиков может быть много, поэтому это задача очереди
+    jobs, а не часть запроса на отписку.
+    """
+    if is_celebrity(author_id):
+        return
+    # Подписчиков не больше порога знаменитости, а посты читаются частями.
+    followers = list(Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True))
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date'
+    )
+    entries = []
+    for post_id, pub_date in posts.iterator(chunk_size=BATCH_SIZE):
+        entries.extend(
+            TimelineEntry(user_id=user_id, post_id=post_id,
+                          pub_date=pub_date)
+            for user_id in followers
+        )
+        if len(entries) >= BATCH_SIZE:
+            _save(entries)
+            entries = []
+    _save(entries)
+
+
+def prune(user, author):
+    """
+    Убирает из входящих пользователя посты автора после отписки.
+    """
+    TimelineEntry.objects.filter(user=user, post__author=author).delete()
+
+
+def rebuild(user):
+    """
+    Пересобирает входящие пользователя с нуля по его подпискам.
+    """
+    TimelineEntry.objects.filter(user=user).delete()
+    for follow in Follow.objects.filter(user=user).select_related('author'):
+        backfill(user, follow.author)
+
+
+def followed_celebrities(user):
+    return list(
+        UserStats.objects.filter(
+            user__following__user=user,
+            followers_count__gt=celebrity_threshold(),
+        ).values_list('user_id', flat=True)
+    )
+
+
+def timeline_posts(user):
+    """
+    Посты ленты подписок: входящие пользователя плюс посты
+    «знаменитостей», подмешанные при чтении.
+    """
+    celebrities = followed_celebrities(user)
+    if not celebrities:
+        # Порядок задаёт индекс входящих (user, -pub_date): лента
+        # читается одним диапазоном без сортировки.
+        return Post.objects.filter(timeline_entries__user=user).order_by(
+            '-timeline_entries__pub_date'
+        )
+    inbox = TimelineEntry.objects.filter(user=user).values('post_id')
+    return Post.objects.filter(
+        Q(id__in=inbox) | Q(author__in=celebrities)
+    )
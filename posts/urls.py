@@ -1,4 +1,4 @@
-from . import views
+from . import api, views
 from django.urls import path
 
 
@@ -7,6 +7,20 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group'),
     path('new/', views.new_post, name='new-post'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('search/', views.search_posts, name='search'),
+    path('export/', views.export_data, name='export'),
+    # JSON API; /api/follow/ занят подпиской на пользователя «api».
+    path('api/posts/', api.index, name='api_index'),
+    path('api/posts/new/', api.index_since, name='api_index_since'),
+    path('api/posts/<int:post_id>/', api.post_view, name='api_post'),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group'),
+    path('api/group/<slug:slug>/new/', api.group_since,
+         name='api_group_since'),
+    path('api/users/<str:username>/', api.profile, name='api_profile'),
+    path('api/users/<str:username>/new/', api.profile_since,
+         name='api_profile_since'),
+    path('api/following/', api.follow_index, name='api_follow_index'),
+    path('api/following/new/', api.follow_since, name='api_follow_since'),
     path('<str:username>/follow/', views.profile_follow,
          name="profile_follow"),
     path('<str:username>/unfollow/', views.profile_unfollow,
@@ -17,4 +31,6 @@ urlpatterns = [
          views.post_edit, name='post_edit'),
     path('<str:username>/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('<str:username>/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
 ]
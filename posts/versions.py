@@ -0,0 +1,69 @@
+"""
+Версии лент для ключей фрагментного кеша.
+
+Каждая лента (вся лента, группа, автор, пост) имеет номер версии в кеше.
+Сигналы Post, Comment и Follow увеличивают нужные версии, а шаблоны
+добавляют их в ключ {% cache %}, поэтому изменение сразу даёт новый
+ключ, а старые фрагменты просто вытесняются по таймауту.
+"""
+import time
+
+from django.core.cache import cache
+
+GLOBAL = 'global'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(user_id):
+    return f'author:{user_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def post_scopes(post_id, author_id, *group_ids):
+    """
+    Версии всех лент, в которых виден пост.
+    """
+    scopes = [GLOBAL, author_scope(author_id), post_scope(post_id)]
+    scopes += [group_scope(pk) for pk in group_ids if pk]
+    return scopes
+
+
+def _key(scope):
+    return f'feed_version:{scope}'
+
+
+def _initial():
+    # Версия, потерянная кешем, не должна совпасть с прежней, иначе
+    # снова станут видны фрагменты, собранные до потери.
+    return int(time.time() * 1000)
+
+
+def get_versions(*scopes):
+    keys = [_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    missing = {key: _initial() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def cache_version(*scopes):
+    """
+    Строка версий для ключа фрагмента, например «1597350000000.3».
+    """
+    return '.'.join(str(version) for version in get_versions(*scopes))
+
+
+def bump(*scopes):
+    for scope in set(scopes):
+        try:
+            cache.incr(_key(scope))
+        except ValueError:
+            cache.set(_key(scope), _initial(), timeout=None)
@@ -1,34 +1,69 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.paginator import Paginator
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import (HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
+from django.urls import reverse
 from .models import Post, Group, User, Follow
 from .forms import PostForm, CommentForm
+from .pagination import (COMMENTS_PER_PAGE, PER_PAGE, comments_after,
+                         paginate)
+from . import counters, export, search, thumbnails, timeline, versions
+from .page_cache import anonymous_page_cache
 from posts.models import Post
 from django.contrib.auth.decorators import login_required
+from yatube.routers import read_replica
 
 
+def author_id(username):
+    return User.objects.filter(username=username).values_list(
+        'id', flat=True
+    ).first()
+
+
+def author_scopes(username, **kwargs):
+    pk = author_id(username)
+    return None if pk is None else [versions.author_scope(pk)]
+
+
+def post_scopes(username, post_id):
+    pk = author_id(username)
+    if pk is None:
+        return None
+    return [versions.post_scope(post_id), versions.author_scope(pk)]
+
+
+@anonymous_page_cache(lambda: [versions.GLOBAL])
+@read_replica
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = Post.objects.for_feed()
+    post_list = post_list.with_count(
+        counters.feed_count(versions.GLOBAL, post_list)
+    )
+    paginator, page = paginate(request, post_list)
     return render(
         request,
         'index.html',
         {
             'page': page,
-            'paginator': paginator
+            'paginator': paginator,
+            'cache_version': versions.cache_version(versions.GLOBAL),
         }
     )
 
 
+# Любое изменение поста увеличивает и GLOBAL, поэтому группе хватает
+# общей версии и не нужен запрос за id группы.
+@anonymous_page_cache(lambda slug: [versions.GLOBAL])
+@read_replica
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     posts = group.posts.all()[:12]
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, 10)
-
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = group.posts.for_feed()
+    post_list = post_list.with_count(
+        counters.feed_count(versions.group_scope(group.pk), post_list)
+    )
+    paginator, page = paginate(request, post_list)
     return render(
         request,
         "group.html",
@@ -36,11 +71,51 @@ def group_posts(request, slug):
             "group": group,
             "posts": posts,
             'paginator': paginator,
-            'page': page
+            'page': page,
+            'cache_version': versions.cache_version(
+                versions.group_scope(group.pk)
+            ),
+        }
+    )
+
+
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    post_ids = search.search_posts(query) if query else []
+    paginator = Paginator(post_ids, PER_PAGE)
+    page = paginator.get_page(request.GET.get('page'))
+    posts = Post.objects.for_feed().in_bulk(page.object_list)
+    page.object_list = [posts[pk] for pk in page.object_list if pk in posts]
+    return render(
+        request,
+        'search.html',
+        {
+            'query': query,
+            'paginator': paginator,
+            'page': page,
         }
     )
 
 
+@staff_member_required
+def export_data(request):
+    models = request.GET.getlist('model') or list(export.MODELS)
+    file_format = request.GET.get('format', 'jsonl')
+    if file_format not in export.FORMATS or \
+            not set(models) <= set(export.MODELS):
+        return HttpResponseBadRequest()
+    try:
+        lines = export.export(models, file_format)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(
+        lines, content_type=export.CONTENT_TYPES[file_format]
+    )
+    response['Content-Disposition'] = \
+        f'attachment; filename="yatube.{file_format}"'
+    return response
+
+
 @login_required
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -48,42 +123,84 @@ def new_post(request):
         post_new = form.save(commit=False)
         post_new.author = request.user
         post_new.save()
+        thumbnails.queue(post_new)
         return redirect('index')
     return render(request, 'new_post.html', {'form': form})
 
 
+@anonymous_page_cache(author_scopes)
+@read_replica
 def profile(request, username):
-    user = get_object_or_404(User,
+    user = get_object_or_404(User.objects.select_related('stats'),
                              username=username)
-    post_list = user.posts.all()
-    paginator = Paginator(post_list, 10)
-    post_count = paginator.count
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = user.posts.for_feed()
+    if hasattr(user, 'stats'):
+        post_list = post_list.with_count(user.stats.posts_count)
+    paginator, page = paginate(request, post_list)
     return render(
         request,
         'profile.html',
         {
             'profile': user,
+            'author': user,
             'post_list': post_list,
-            'my_posts': post_count,
             'paginator': paginator,
-            'page': page
+            'page': page,
+            'cache_version': versions.cache_version(
+                versions.author_scope(user.pk)
+            ),
         }
     )
 
 
+@anonymous_page_cache(post_scopes)
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post.objects.select_related('author'),
-                             id=post_id, author__username=username)
+    post = get_object_or_404(
+        Post.objects.for_feed().select_related('author__stats'),
+        id=post_id, author__username=username
+    )
     form = CommentForm()
-    comments = post.comments.all()
+    # Первая порция; остальные подгружает post_comments.
+    comments = post.comments.select_related('author').order_by(
+        'created', 'id'
+    )[:COMMENTS_PER_PAGE]
     author = post.author
     return render(
         request,
         'post.html',
-        {'post': post, 'author': author, 'comments': comments, 'form': form}
+        {
+            'post': post,
+            'author': author,
+            'comments': comments,
+            'form': form,
+            'cache_version': versions.cache_version(
+                versions.post_scope(post.pk)
+            ),
+        }
+    )
+
+
+@read_replica
+def post_comments(request, username, post_id):
+    post = get_object_or_404(Post.objects.only('id'),
+                             id=post_id, author__username=username)
+    comments, cursor = comments_after(
+        post.comments.select_related('author'), request.GET.get('cursor')
     )
+    return JsonResponse({
+        'comments': [
+            {
+                'id': comment.pk,
+                'author': comment.author.username,
+                'author_url': reverse('profile',
+                                      args=[comment.author.username]),
+                'text': comment.text,
+                'created': comment.created.isoformat(),
+            }
+            for comment in comments
+        ],
+        'next': cursor,
+    })
 
 
 @login_required
@@ -97,9 +214,12 @@ def post_edit(request, username, post_id):
                         username=username,
                         post_id=post_id)
 
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    instance=post)
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            thumbnails.queue(post)
         return redirect('post',
                         username=username,
                         post_id=post_id)
@@ -141,16 +261,17 @@ def add_comment(request, post_id, username):
 
 
 @login_required
+@read_replica
 def follow_index(request):
     author = get_object_or_404(User, username=request.user.username)
-    post_list = (
-        Post.objects.select_related('author').filter(
-            author__following__user=request.user)
-    )
-    paginator = Paginator(post_list, 10)
-
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    if timeline.is_enabled():
+        post_list = timeline.timeline_posts(request.user).for_feed()
+    else:
+        post_list = (
+            Post.objects.for_feed().filter(
+                author__following__user=request.user)
+        )
+    paginator, page = paginate(request, post_list)
     return render(request,
                   "follow.html",
                   {
@@ -1,4 +1,22 @@
+import pytest
+
 pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def sync_thumbnails(settings):
+    settings.THUMBNAIL_ASYNC = False
+
+
+@pytest.fixture(autouse=True)
+def private_cache(settings, tmp_path):
+    # Отдельные файлы кеша и событий на тест, чтобы не делить их с другими
+    # запусками.
+    settings.CACHES = {
+        name: dict(config, LOCATION=str(tmp_path / f'{name}.cache'))
+        for name, config in settings.CACHES.items()
+    }
+    settings.EVENTS_LOCATION = str(tmp_path / 'events.sqlite3')
@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Follow, Post
+
+
+class TestApi:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_pages_with_cursor(self, client, user, group):
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=user, group=group if i % 2 else None)
+            for i in range(15)
+        ])
+
+        with CaptureQueriesContext(connection) as captured:
+            first = client.get('/api/posts/', {'limit': 10}).json()
+        assert len(first['results']) == 10 and first['next'], \
+            'Проверьте, что API отдаёт страницу ленты и курсор следующей'
+        assert len(captured) == 3, \
+            'Проверьте, что посты, авторы и группы читаются тремя запросами'
+        post = first['results'][0]
+        assert post['author']['username'] == user.username, \
+            'Проверьте, что автор поста приходит вложенным объектом'
+
+        second = client.get('/api/posts/', {'cursor': first['next']}).json()
+        ids = [post['id'] for post in first['results'] + second['results']]
+        assert len(ids) == 15 and len(set(ids)) == 15 \
+            and second['next'] is None, \
+            'Проверьте, что курсор продолжает ленту без повторов'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_sparse_fields(self, client, post):
+        with CaptureQueriesContext(connection) as captured:
+            data = client.get('/api/posts/', {'fields': 'id,text'}).json()
+        assert data['results'] == [{'id': post.pk, 'text': post.text}], \
+            'Проверьте, что ?fields= оставляет только запрошенные поля'
+        assert len(captured) == 1, \
+            'Проверьте, что без полей author и group не нужны доп. запросы'
+
+        response = client.get('/api/posts/', {'fields': 'id,password'})
+        assert response.status_code == 400, \
+            'Проверьте, что неизвестное поле даёт ошибку 400'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feeds_and_detail(self, client, user, post_with_group, group,
+                              django_user_model):
+        another_user = django_user_model.objects.create_user(
+            username='another', password='1234567')
+        Post.objects.create(text='Чужой пост', author=another_user)
+
+        data = client.get(f'/api/group/{group.slug}/').json()
+        assert [post['id'] for post in data['results']] == \
+            [post_with_group.pk], \
+            'Проверьте, что API группы отдаёт только её посты'
+        data = client.get(f'/api/users/{another_user.username}/').json()
+        assert [post['text'] for post in data['results']] == ['Чужой пост'], \
+            'Проверьте, что API профиля отдаёт только посты автора'
+
+        assert client.get('/api/following/').status_code == 401, \
+            'Проверьте, что лента подписок в API требует авторизации'
+        Follow.objects.create(user=user, author=another_user)
+        client.force_login(user)
+        data = client.get('/api/following/').json()
+        assert [post['text'] for post in data['results']] == ['Чужой пост'], \
+            'Проверьте, что API подписок отдаёт посты авторов из подписок'
+
+        data = client.get(f'/api/posts/{post_with_group.pk}/').json()
+        assert data['group']['slug'] == group.slug \
+            and data['comment_count'] == 0, \
+            'Проверьте, что API поста отдаёт группу и число комментариев'
+        assert client.get('/api/posts/0/').status_code == 404, \
+            'Проверьте, что для несуществующего поста API отвечает 404'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_new_posts_since(self, client, user):
+        old = Post.objects.create(text='Старый пост', author=user)
+        since = client.get('/api/posts/').json()['since']
+        url = '/api/posts/new/'
+
+        response = client.get(url, {'since': since})
+        assert response.json()['count'] == 0, \
+            'Проверьте, что без новых постов счётчик равен нулю'
+        with CaptureQueriesContext(connection) as captured:
+            repeat = client.get(url, {'since': since},
+                                HTTP_IF_NONE_MATCH=response['ETag'])
+        assert repeat.status_code == 304 and not any(
+            'posts_post' in query['sql'] for query in captured
+        ), 'Проверьте, что неизменная лента отвечает 304 без запроса постов'
+
+        new = Post.objects.create(text='Новый пост', author=user)
+        response = client.get(url, {'since': since},
+                              HTTP_IF_NONE_MATCH=response['ETag'])
+        data = response.json()
+        assert response.status_code == 200 and data['count'] == 1 \
+            and data['ids'] == [new.pk] and old.pk not in data['ids'], \
+            'Проверьте, что опрос возвращает только посты новее курсора'
+        data = client.get(url, {'since': data['since']}).json()
+        assert data['count'] == 0, \
+            'Проверьте, что курсор из ответа сдвигается на новый пост'
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import pytest
+
+
+def call(path, query=b'', headers=()):
+    from yatube import asgi
+
+    scope = {'type': 'http', 'method': 'GET', 'path': path,
+             'query_string': query, 'headers': list(headers)}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.application(scope, receive, send))
+    headers = dict(sent[0]['headers'])
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return sent[0]['status'], headers, body.decode()
+
+
+class TestAsgi:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_pages(self, client, user, post):
+        status, _, body = call('/')
+        assert status == 200 and post.text in body, \
+            'Проверьте, что ASGI-приложение отдаёт главную страницу'
+        status, _, body = call(f'/{user.username}/{post.pk}/')
+        assert status == 200 and post.text in body, \
+            'Проверьте, что ASGI-приложение отдаёт страницу поста'
+        status, _, _ = call('/group/missing/')
+        assert status == 404, \
+            'Проверьте, что ошибки Django доходят до клиента ASGI'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_session_and_query(self, client, user, post):
+        status, _, _ = call('/follow/')
+        assert status == 302, \
+            'Проверьте, что без входа лента подписок перенаправляет на вход'
+
+        client.force_login(user)
+        cookie = f'sessionid={client.cookies["sessionid"].value}'.encode()
+        status, _, _ = call('/follow/', headers=[(b'cookie', cookie)])
+        assert status == 200, \
+            'Проверьте, что ASGI-приложение передаёт Django куки сессии'
+        _, headers, body = call('/api/posts/', b'fields=id,text')
+        assert headers[b'content-type'] == b'application/json' \
+            and json.loads(body)['results'] == [
+                {'id': post.pk, 'text': post.text}
+            ], \
+            'Проверьте, что ASGI-приложение передаёт Django строку запроса'
@@ -0,0 +1,52 @@
+import multiprocessing
+
+from django.core.cache import cache, caches
+
+
+def increment(times):
+    for _ in range(times):
+        cache.incr('counter')
+
+
+class TestSQLiteCache:
+
+    def test_basic_operations(self):
+        cache.set('key', {'value': 1})
+        assert cache.get('key') == {'value': 1}, \
+            'Проверьте, что кеш возвращает сохранённое значение'
+        assert not cache.add('key', 'другое'), \
+            'Проверьте, что add не перезаписывает живой ключ'
+        assert cache.get('missing', 'default') == 'default', \
+            'Проверьте, что для отсутствующего ключа возвращается default'
+        cache.set('expired', 1, timeout=-1)
+        assert cache.get('expired') is None, \
+            'Проверьте, что просроченные ключи не возвращаются'
+        assert cache.get('key', version=2) is None, \
+            'Проверьте, что версия входит в ключ'
+
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses']) == (1, 3), \
+            'Проверьте подсчёт попаданий и промахов'
+
+    def test_shared_between_processes(self):
+        cache.set('counter', 0, timeout=None)
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=increment, args=(50,))
+                     for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert cache.get('counter') == 200, \
+            'Проверьте, что процессы делят кеш и incr атомарен'
+
+    def test_eviction(self, settings):
+        settings.CACHES['default']['OPTIONS'] = {
+            'MAX_ENTRIES': 10, 'CULL_FREQUENCY': 2, 'CULL_EVERY': 1,
+        }
+        limited = caches['default']
+        for number in range(20):
+            limited.set(f'key{number}', number)
+        stats = limited.stats()
+        assert stats['entries'] <= 10 and stats['evictions'] > 0, \
+            'Проверьте вытеснение записей сверх MAX_ENTRIES'
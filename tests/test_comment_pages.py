@@ -0,0 +1,36 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment
+from posts.pagination import COMMENTS_PER_PAGE
+
+
+class TestCommentPages:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_first_page_and_load_more(self, user_client, user, post):
+        total = COMMENTS_PER_PAGE + 5
+        for i in range(total):
+            Comment.objects.create(post=post, author=user, text=f'Комментарий {i}')
+        url = f'/{user.username}/{post.pk}/'
+
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.get(url)
+        content = response.content.decode()
+        assert f'Комментарий {COMMENTS_PER_PAGE - 1}' in content and not any(
+            f'Комментарий {i}' in content for i in range(COMMENTS_PER_PAGE, total)
+        ), \
+            'Проверьте, что страница поста показывает только первую порцию комментариев'
+        comment_queries = [query for query in captured.captured_queries
+                           if 'FROM "posts_comment"' in query['sql']]
+        assert len(comment_queries) == 1, \
+            'Проверьте, что комментарии и их авторы загружаются одним запросом'
+
+        cursor = content.split('data-cursor="')[1].split('"')[0]
+        data = user_client.get(f'{url}comments/', {'cursor': cursor}).json()
+        assert [comment['text'] for comment in data['comments']] == \
+            [f'Комментарий {i}' for i in range(COMMENTS_PER_PAGE, total)], \
+            'Проверьте, что load more возвращает оставшиеся комментарии по порядку'
+        assert data['next'] is None, \
+            'Проверьте, что после последней порции курсор пустой'
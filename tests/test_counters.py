@@ -0,0 +1,62 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from posts.models import Comment, Follow, Post, UserStats
+
+
+class TestCounters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_counters_follow_changes(self, user):
+        author = get_user_model().objects.create_user(username='CountedAuthor')
+        post = Post.objects.create(text='Пост', author=author)
+        Comment.objects.create(post=post, author=user, text='Комментарий')
+        follow = Follow.objects.create(user=user, author=author)
+
+        stats = UserStats.objects.get(user=author)
+        assert stats.posts_count == 1, 'Проверьте счётчик постов автора'
+        assert stats.followers_count == 1, 'Проверьте счётчик подписчиков автора'
+        assert UserStats.objects.get(user=user).following_count == 1, \
+            'Проверьте счётчик подписок пользователя'
+        post.refresh_from_db()
+        assert post.comment_count == 1, 'Проверьте счётчик комментариев поста'
+
+        follow.delete()
+        post.delete()
+        stats.refresh_from_db()
+        assert (stats.posts_count, stats.followers_count) == (0, 0), \
+            'Проверьте, что счётчики уменьшаются при удалении'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_edit_keeps_comment_count(self, user_client, user):
+        post = Post.objects.create(text='Пост', author=user)
+        edited = Post.objects.get(pk=post.pk)
+        Comment.objects.create(post=post, author=user, text='Комментарий')
+        edited.text = 'Изменённый пост'
+        edited.save()
+        post.refresh_from_db()
+        assert (post.text, post.comment_count) == ('Изменённый пост', 1), \
+            'Проверьте, что сохранение поста не затирает счётчик комментариев'
+
+        Comment.objects.create(post=post, author=user, text='Ещё один')
+        user_client.post(f'/{user.username}/{post.pk}/edit/',
+                         {'text': 'Пост из формы'})
+        post.refresh_from_db()
+        assert (post.text, post.comment_count) == ('Пост из формы', 2), \
+            'Проверьте, что форма редактирования сохраняет счётчик'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_recount_repairs_drift(self, user):
+        post = Post.objects.create(text='Пост', author=user)
+        Comment.objects.create(post=post, author=user, text='Комментарий')
+        UserStats.objects.filter(user=user).update(posts_count=42)
+        Post.objects.filter(pk=post.pk).update(comment_count=0)
+
+        call_command('recount_counters')
+
+        assert UserStats.objects.get(user=user).posts_count == 1, \
+            'Проверьте, что recount_counters чинит счётчик постов'
+        post.refresh_from_db()
+        assert post.comment_count == 1, \
+            'Проверьте, что recount_counters чинит счётчик комментариев'
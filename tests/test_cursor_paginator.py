@@ -0,0 +1,49 @@
+import pytest
+
+from posts.models import Post
+from posts.pagination import CursorPaginator, decode_cursor
+
+
+class TestCursorPaginator:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cursor_pages(self, user):
+        for i in range(25):
+            Post.objects.create(text=f'Пост {i}', author=user)
+        expected = list(Post.objects.order_by('-pub_date', '-id'))
+        paginator = CursorPaginator(Post.objects.all(), 10)
+
+        first = paginator.get_page(None)
+        assert list(first) == expected[:10], \
+            'Проверьте, что первая страница курсорной паджинации содержит самые новые посты'
+        assert first.has_next() and not first.has_previous(), \
+            'Проверьте флаги соседних страниц на первой странице'
+
+        second = paginator.get_page(first.next_cursor)
+        assert list(second) == expected[10:20], \
+            'Проверьте, что токен next_cursor ведёт на следующую страницу'
+
+        third = paginator.get_page(second.next_cursor)
+        assert list(third) == expected[20:], \
+            'Проверьте последнюю страницу курсорной паджинации'
+        assert not third.has_next(), \
+            'Проверьте, что на последней странице нет ссылки на следующую'
+
+        back = paginator.get_page(third.previous_cursor)
+        assert list(back) == expected[10:20], \
+            'Проверьте, что токен previous_cursor ведёт на предыдущую страницу'
+
+    def test_bad_cursor(self):
+        assert decode_cursor('не-токен') is None, \
+            'Проверьте, что битый токен курсора игнорируется'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cursor_view(self, client, user):
+        for i in range(12):
+            Post.objects.create(text=f'Пост {i}', author=user)
+        response = client.get('/?cursor=')
+        page = response.context['page']
+        assert len(page) == 10, \
+            'Проверьте, что лента отдаёт страницу по курсору'
+        assert page.next_cursor in response.content.decode(), \
+            'Проверьте, что паджинатор выводит ссылку с токеном курсора'
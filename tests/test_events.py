@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from posts import events
+from posts.models import Comment, Post
+
+
+def stream(path, action=None, last_event_id=None, timeout=5):
+    """
+    Открывает SSE-соединение, выполняет action в другом потоке и
+    возвращает статус и всё, что сервер успел прислать.
+    """
+    from yatube import asgi
+
+    headers = []
+    if last_event_id is not None:
+        headers.append((b'last-event-id', str(last_event_id).encode()))
+    scope = {'type': 'http', 'method': 'GET', 'path': path,
+             'headers': headers}
+    sent = []
+
+    async def main():
+        disconnect = asyncio.Event()
+        requests = [{'type': 'http.request', 'body': b''}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        async def wait_for(condition):
+            deadline = time.monotonic() + timeout
+            while not condition() and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+
+        task = asyncio.ensure_future(asgi.application(scope, receive, send))
+        await wait_for(lambda: len(sent) > 1 or task.done())
+        if action is not None and not task.done():
+            await asyncio.get_running_loop().run_in_executor(None, action)
+            await wait_for(lambda: len(sent) > 2)
+        disconnect.set()
+        await task
+        await asgi.hub.stop()
+
+    asyncio.run(main())
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return sent[0]['status'], body.decode()
+
+
+def parse(body):
+    found = []
+    for block in body.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines()
+                      if ': ' in line and not line.startswith(':'))
+        if 'event' in fields:
+            found.append((fields['event'], json.loads(fields['data'])))
+    return found
+
+
+class TestEvents:
+
+    @pytest.fixture(autouse=True)
+    def fast_polling(self, settings):
+        settings.EVENTS_POLL_INTERVAL = 0.02
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_streams_new_posts(self, user, group):
+        status, body = stream(
+            f'/events/group/{group.slug}/',
+            lambda: Post.objects.create(text='Живой пост', author=user,
+                                        group=group),
+        )
+        found = parse(body)
+        assert status == 200 and len(found) == 1 and found[0][0] == 'post', \
+            'Проверьте, что лента группы получает событие о новом посте'
+        data = found[0][1]
+        assert (data['id'], data['author'], data['text']) == \
+            (Post.objects.get().pk, user.username, 'Живой пост'), \
+            'Проверьте, что событие содержит id, автора и текст поста'
+
+        status, _ = stream('/events/group/missing/')
+        assert status == 404, \
+            'Проверьте, что для несуществующей группы поток отвечает 404'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_streams_comments_and_replays(self, user, post):
+        other = Post.objects.create(text='Другой пост', author=user)
+        status, body = stream(
+            f'/events/{user.username}/{post.pk}/',
+            lambda: [
+                Comment.objects.create(post=other, author=user, text='Мимо'),
+                Comment.objects.create(post=post, author=user, text='Сюда'),
+            ],
+        )
+        assert [data['text'] for _, data in parse(body)] == ['Сюда'], \
+            'Проверьте, что страница поста получает только свои комментарии'
+
+        relay = events.get_relay()
+        first = relay.last_id()
+        Comment.objects.create(post=post, author=user, text='Пропущенный')
+        _, body = stream(f'/events/{user.username}/{post.pk}/',
+                         last_event_id=first)
+        assert [data['text'] for _, data in parse(body)] == \
+            ['Пропущенный'], \
+            'Проверьте, что по Last-Event-ID дочитываются пропущенные события'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_idle_hub_skips_old_events(self, user):
+        from yatube import asgi
+
+        async def main():
+            hub = asgi.Hub()
+            await hub.start()
+            Post.objects.create(text='Старый пост', author=user)
+            await asyncio.sleep(0.1)
+
+            await hub.start()
+            subscription = hub.subscribe(events.FEED)
+            Post.objects.create(text='Новый пост', author=user)
+            await asyncio.sleep(0.1)
+            await hub.stop()
+            rows = []
+            while not subscription.queue.empty():
+                rows.append(subscription.queue.get_nowait())
+            return rows
+
+        rows = asyncio.run(main())
+        assert [json.loads(row[3])['text'] for row in rows] == \
+            ['Новый пост'], \
+            'Проверьте, что после простоя подписчик не получает старые события'
@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import Comment, Follow, Post
+
+
+class TestExport:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_command_round_trip(self, tmp_path, user, post_with_group,
+                                       django_user_model):
+        Comment.objects.create(post=post_with_group, author=user, text='Комментарий')
+        reader = django_user_model.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=user)
+        output = tmp_path / 'dump.jsonl'
+        call_command('export_data', output=str(output))
+
+        lines = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+        models = [line['model'] for line in lines]
+        assert models == ['user', 'user', 'group', 'post', 'comment',
+                          'follow'], \
+            'Проверьте, что выгрузка содержит все модели по порядку'
+        assert lines[-1] == {'model': 'follow', 'user': reader.username,
+                             'author': user.username}, \
+            'Проверьте, что подписки выгружаются как пары username'
+        post = lines[3]
+        assert post['author'] == user.username and post['group'] == post_with_group.group.slug, \
+            'Проверьте, что внешние ключи выгружаются как username и slug'
+
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+        call_command('import_data', str(output))
+        assert Comment.objects.get().post_id == post_with_group.pk, \
+            'Проверьте, что выгрузку можно загрузить обратно командой import_data'
+        assert Follow.objects.filter(user=reader, author=user).exists(), \
+            'Проверьте, что подписки загружаются обратно'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_view_is_staff_only(self, client, user, post):
+        response = client.get('/export/?model=post&format=csv')
+        assert response.status_code == 302, \
+            'Проверьте, что выгрузка недоступна анонимным пользователям'
+
+        user.is_staff = True
+        user.save()
+        client.force_login(user)
+        response = client.get('/export/?model=post&format=csv')
+        assert response.streaming, \
+            'Проверьте, что выгрузка отдаётся StreamingHttpResponse'
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert [row['text'] for row in rows] == [post.text], \
+            'Проверьте, что CSV содержит посты'
+
+        response = client.get('/export/?format=csv')
+        assert response.status_code == 400, \
+            'Проверьте, что CSV выгружает только одну модель'
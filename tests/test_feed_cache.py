@@ -0,0 +1,71 @@
+import pytest
+from django.core.cache import cache
+from django.test import Client
+
+from posts.models import Comment, Post
+
+
+class TestFeedCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_new_post_visible_immediately(self, client, user):
+        cache.clear()
+        Post.objects.create(text='Первый пост', author=user)
+        client.get('/')
+        Post.objects.create(text='Второй пост', author=user)
+        response = client.get('/')
+        assert 'Второй пост' in response.content.decode(), \
+            'Проверьте, что новый пост сразу виден на главной странице с кешем'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_fragment_reused_until_change(self, client, user):
+        cache.clear()
+        post = Post.objects.create(text='Пост', author=user)
+        client.get('/')
+        Post.objects.filter(pk=post.pk).update(text='Изменён без сигналов')
+        response = client.get('/')
+        assert 'Изменён без сигналов' not in response.content.decode(), \
+            'Проверьте, что главная страница отдаётся из кеша, пока лента не изменилась'
+
+        Comment.objects.create(post=post, author=user, text='Комментарий')
+        response = client.get(f'/{user.username}/{post.pk}/')
+        assert 'Комментарий' in response.content.decode(), \
+            'Проверьте, что новый комментарий сразу виден на странице поста'
+        response = client.get('/')
+        assert '1 комментариев' in response.content.decode(), \
+            'Проверьте, что комментарий обновляет кеш главной страницы'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_card_edit_link_per_viewer(self, user_client, user):
+        client = Client()
+        cache.clear()
+        post = Post.objects.create(text='Пост', author=user)
+        edit_url = f'/{user.username}/{post.pk}/edit/'
+        response = client.get(f'/{user.username}/')
+        assert edit_url not in response.content.decode(), \
+            'Проверьте, что ссылка «Редактировать» не видна чужим зрителям'
+        response = user_client.get('/')
+        assert edit_url in response.content.decode(), \
+            'Проверьте, что автор видит ссылку «Редактировать» в карточке из кеша'
+
+        user_client.post(edit_url, data={'text': 'Исправленный пост'})
+        response = client.get(f'/{user.username}/')
+        assert 'Исправленный пост' in response.content.decode(), \
+            'Проверьте, что редактирование поста сбрасывает кеш карточки'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_fragment_shared_between_viewers(self, user_client, user,
+                                             django_user_model):
+        cache.clear()
+        post = Post.objects.create(text='Пост', author=user)
+        edit_url = f'/{user.username}/{post.pk}/edit/'
+        reader = Client()
+        reader.force_login(django_user_model.objects.create_user('reader'))
+        response = reader.get('/')
+        assert edit_url not in response.content.decode(), \
+            'Проверьте, что чужой зритель не видит ссылку «Редактировать»'
+
+        Post.objects.filter(pk=post.pk).update(text='Изменён без сигналов')
+        content = user_client.get('/').content.decode()
+        assert 'Изменён без сигналов' not in content and edit_url in content, \
+            'Проверьте, что автор получает общий фрагмент со своей ссылкой'
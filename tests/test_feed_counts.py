@@ -0,0 +1,46 @@
+import pytest
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Post
+from posts.pagination import page_window
+
+
+def count_queries(captured):
+    return [query['sql'] for query in captured.captured_queries
+            if 'COUNT(*)' in query['sql']]
+
+
+class TestFeedCounts:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_count_without_count_query(self, user_client, user):
+        for i in range(15):
+            Post.objects.create(text=f'Пост {i}', author=user)
+        user_client.get('/')
+
+        Post.objects.create(text='Ещё пост', author=user)
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.get('/')
+        assert response.context['paginator'].count == 16, \
+            'Проверьте, что сигналы обновляют число постов ленты'
+        assert not count_queries(captured), \
+            'Проверьте, что главная страница не считает посты COUNT(*) при каждом запросе'
+
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.get(f'/{user.username}/')
+        assert response.context['paginator'].count == 16, \
+            'Проверьте, что профиль берёт число постов из счётчика автора'
+        assert not count_queries(captured), \
+            'Проверьте, что профиль не считает посты COUNT(*)'
+
+    def test_page_window(self):
+        paginator = Paginator(range(500), 10)
+        assert page_window(paginator.page(10)) == \
+            [1, None, 8, 9, 10, 11, 12, None, 50], \
+            'Проверьте окно номеров страниц вокруг текущей'
+        assert page_window(paginator.page(1)) == [1, 2, 3, None, 50], \
+            'Проверьте окно номеров на первой странице'
+        assert page_window(Paginator(range(30), 10).page(2)) == [1, 2, 3], \
+            'Проверьте, что при малом числе страниц выводятся все номера'
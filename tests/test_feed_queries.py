@@ -0,0 +1,40 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment, Follow, Group, Post
+
+
+def count_queries(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, f'Страница `{url}` должна открываться'
+    return len(queries)
+
+
+def add_posts(author, group, count):
+    for i in range(count):
+        post = Post.objects.create(text=f'Пост {i}', author=author, group=group)
+        Comment.objects.create(post=post, author=author, text='Комментарий')
+
+
+class TestFeedQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_query_count_is_fixed(self, user_client, user):
+        author = get_user_model().objects.create_user(username='FeedAuthor')
+        group = Group.objects.create(title='Группа', slug='feed-group', description='Описание')
+        Follow.objects.create(user=user, author=author)
+        urls = ['/', f'/group/{group.slug}/', f'/{author.username}/', '/follow/']
+
+        add_posts(author, group, 2)
+        small = {url: count_queries(user_client, url) for url in urls}
+        add_posts(author, group, 8)
+        for url in urls:
+            assert count_queries(user_client, url) == small[url], \
+                f'Проверьте, что число запросов на странице `{url}` не зависит от числа постов'
+            assert small[url] <= 8, \
+                f'Проверьте, что страница `{url}` не делает лишних запросов'
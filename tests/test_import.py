@@ -0,0 +1,87 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+
+from posts import search, versions
+from posts.models import Comment, Follow, Post, UserStats
+
+
+class TestImportData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_import_jsonl_and_csv(self, tmp_path):
+        records = [
+            {'model': 'user', 'username': 'imported_author'},
+            {'model': 'user', 'username': 'imported_reader'},
+            {'model': 'group', 'title': 'Импорт', 'slug': 'imported'},
+            {'model': 'post', 'id': 500, 'text': 'Импортированный пост',
+             'author': 'imported_author', 'group': 'imported',
+             'pub_date': '2020-01-01T10:00:00'},
+            {'model': 'follow', 'user': 'imported_reader',
+             'author': 'imported_author'},
+        ]
+        jsonl = tmp_path / 'data.jsonl'
+        jsonl.write_text('\n'.join(json.dumps(record, ensure_ascii=False)
+                                   for record in records), encoding='utf-8')
+        comments = tmp_path / 'comments.csv'
+        comments.write_text('post,author,text\n500,imported_reader,Первый\n'
+                            '500,imported_reader,Второй\n', encoding='utf-8')
+
+        call_command('import_data', str(jsonl), batch_size=1)
+        call_command('import_data', str(comments), model='comment')
+
+        post = Post.objects.get(pk=500)
+        assert post.group.slug == 'imported', \
+            'Проверьте, что группа поста находится по slug'
+        assert post.pub_date.year == 2020, \
+            'Проверьте, что импорт сохраняет дату публикации'
+        assert Comment.objects.filter(post=post).count() == 2, \
+            'Проверьте импорт комментариев из CSV'
+        assert Follow.objects.filter(author=post.author).count() == 1, \
+            'Проверьте импорт подписок'
+
+        post.refresh_from_db()
+        assert post.comment_count == 2, \
+            'Проверьте, что после импорта пересчитываются счётчики'
+        assert UserStats.objects.get(user=post.author).followers_count == 1, \
+            'Проверьте, что после импорта создаются счётчики пользователей'
+        assert search.search_posts('импортированный') == [500], \
+            'Проверьте, что после импорта перестраивается поисковый индекс'
+        assert not get_user_model().objects.get(
+            username='imported_reader').has_usable_password(), \
+            'Проверьте, что пользователи без пароля не могут войти'
+
+        new_post = Post.objects.create(text='Новый', author=post.author)
+        assert new_post.pk > 500, \
+            'Проверьте, что после импорта с явными id сбрасываются счётчики ключей'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_repeated_import_and_cache(self, tmp_path):
+        records = [
+            {'model': 'user', 'username': 'imported_author'},
+            {'model': 'user', 'username': 'imported_reader'},
+            {'model': 'post', 'id': 700, 'text': 'Пост с id',
+             'author': 'imported_author'},
+            {'model': 'comment', 'id': 900, 'post': 700,
+             'author': 'imported_reader', 'text': 'Комментарий с id'},
+            {'model': 'follow', 'user': 'imported_reader',
+             'author': 'imported_author'},
+        ]
+        jsonl = tmp_path / 'data.jsonl'
+        jsonl.write_text('\n'.join(json.dumps(record, ensure_ascii=False)
+                                   for record in records), encoding='utf-8')
+        call_command('import_data', str(jsonl))
+        cache.set('thumbnail:ready', 'url')
+        version = versions.cache_version(versions.GLOBAL)
+
+        call_command('import_data', str(jsonl))
+        assert (Post.objects.count(), Comment.objects.count(),
+                Follow.objects.count()) == (1, 1, 1), \
+            'Проверьте, что повторная загрузка пропускает уже загруженное'
+        assert cache.get('thumbnail:ready') == 'url', \
+            'Проверьте, что импорт не очищает весь кеш'
+        assert versions.cache_version(versions.GLOBAL) != version, \
+            'Проверьте, что импорт сбрасывает версии лент'
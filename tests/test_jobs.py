@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job
+from posts.models import Comment, Follow
+
+calls = []
+
+
+@queue.task(max_attempts=2)
+def flaky(fail):
+    calls.append(fail)
+    if fail:
+        raise RuntimeError('почтовый сервер недоступен')
+
+
+def run_jobs():
+    call_command('run_jobs', '--once', '--poll', '0.01')
+
+
+class TestJobs:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_signup_email_is_queued(self, client):
+        response = client.post('/auth/signup/', {
+            'username': 'newbie', 'email': 'newbie@example.com',
+            'first_name': 'Новый', 'last_name': 'Пользователь',
+            'password1': 'Sl0zhnyi-parol', 'password2': 'Sl0zhnyi-parol',
+        })
+        assert response.status_code == 302 and not mail.outbox, \
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        assert Job.objects.filter(name='jobs.mail.send_email').count() == 1, \
+            'Проверьте, что письмо о регистрации ставится в очередь'
+
+        run_jobs()
+        assert [message.to for message in mail.outbox] == \
+            [['newbie@example.com']], \
+            'Проверьте, что воркер отправляет письмо о регистрации'
+        assert Job.objects.get().status == Job.DONE, \
+            'Проверьте, что выполненная задача отмечается как done'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_notifications(self, user, post, django_user_model):
+        user.email = 'author@example.com'
+        user.save()
+        reader = django_user_model.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=user)
+        Comment.objects.create(post=post, author=reader, text='Отлично')
+        Comment.objects.create(post=post, author=user, text='Спасибо')
+
+        run_jobs()
+        assert sorted(message.subject for message in mail.outbox) == \
+            ['Новый комментарий', 'Новый подписчик'], \
+            'Проверьте, что автор получает письма о подписчике и комментарии'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_retry_with_backoff(self):
+        calls.clear()
+        job = flaky.delay(fail=True)
+        run_jobs()
+        job.refresh_from_db()
+        assert job.status == Job.QUEUED and job.attempts == 1 \
+            and job.run_at > timezone.now() and job.last_error, \
+            'Проверьте, что упавшая задача откладывается для повтора'
+
+        run_jobs()
+        assert calls == [True], \
+            'Проверьте, что повтор не запускается до истечения задержки'
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run_jobs()
+        job.refresh_from_db()
+        assert job.status == Job.FAILED and job.attempts == 2, \
+            'Проверьте, что после последней попытки задача помечается failed'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_claim_is_exclusive_and_recovers(self):
+        job = flaky.delay(fail=False)
+        assert [claimed.pk for claimed in queue.claim(5)] == [job.pk], \
+            'Проверьте, что воркер занимает готовую задачу'
+        assert queue.claim(5) == [], \
+            'Проверьте, что занятую задачу не берёт второй воркер'
+
+        Job.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        assert [claimed.pk for claimed in queue.claim(5)] == [job.pk], \
+            'Проверьте, что задача упавшего воркера снова выполняется'
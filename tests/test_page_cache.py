@@ -0,0 +1,68 @@
+import time
+
+import pytest
+from django.test import Client
+
+from posts.models import Comment, Post
+
+
+class TestAnonymousPageCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_conditional_get_and_invalidation(self, user):
+        post = Post.objects.create(text='Пост', author=user)
+        client = Client()
+
+        response = client.get('/')
+        etag = response['ETag']
+        assert response.has_header('Last-Modified'), \
+            'Проверьте, что главная страница отдаёт Last-Modified'
+
+        Post.objects.filter(pk=post.pk).update(text='Изменён без сигналов')
+        response = client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip', \
+            'Проверьте, что страница хранится и отдаётся сжатой'
+        assert response['ETag'] != etag, \
+            'Проверьте, что у сжатой и несжатой страницы разные ETag'
+        response = client.get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 200 \
+            and 'Content-Encoding' not in response, \
+            'Проверьте, что ETag сжатой страницы не подходит несжатой'
+        response = client.get('/')
+        assert 'Изменён без сигналов' not in response.content.decode(), \
+            'Проверьте, что анонимам страница отдаётся из кеша'
+
+        response = client.get('/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, \
+            'Проверьте, что совпавший ETag даёт 304'
+
+        Comment.objects.create(post=post, author=user, text='Комментарий')
+        response = client.get('/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, \
+            'Проверьте, что комментарий сбрасывает кеш страницы'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_edit_changes_last_modified(self, user):
+        post = Post.objects.create(text='Пост', author=user)
+        client = Client()
+        last_modified = client.get('/')['Last-Modified']
+        response = client.get('/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, \
+            'Проверьте, что неизменная страница по If-Modified-Since даёт 304'
+
+        # Last-Modified передаётся с точностью до секунды.
+        time.sleep(1.1)
+        post.text = 'Исправленный пост'
+        post.save()
+        Client().get('/')  # другой посетитель снова кеширует страницу
+        response = client.get('/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200 \
+            and 'Исправленный пост' in response.content.decode(), \
+            'Проверьте, что после правки If-Modified-Since не даёт 304'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_users_bypass_page_cache(self, user_client, user):
+        Post.objects.create(text='Пост', author=user)
+        response = user_client.get(f'/{user.username}/')
+        assert not response.has_header('ETag'), \
+            'Проверьте, что страницы пользователей не кешируются целиком'
@@ -0,0 +1,41 @@
+import json
+import re
+
+import pytest
+from django.test import Client
+
+from posts.models import Post
+
+
+class TestProfilingMiddleware:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_server_timing_and_log(self, settings, tmp_path, user, group):
+        settings.PROFILING_SAMPLE_RATE = 1
+        settings.PROFILING_LOG = str(tmp_path / 'profiling.jsonl')
+        post = Post.objects.create(text='Пост', author=user, group=group)
+
+        response = Client().get(f'/{user.username}/{post.pk}/')
+        header = response.get('Server-Timing', '')
+        for metric in ('db;dur=', 'tpl;dur=', 'view;dur=', 'total;dur='):
+            assert metric in header, \
+                f'Проверьте, что заголовок Server-Timing содержит `{metric}`'
+
+        timings = {name: float(duration) for name, duration
+                   in re.findall(r'(\w+);dur=([\d.]+)', header)}
+        assert timings['tpl'] <= timings['total'], \
+            'Проверьте, что время вложенных шаблонов не считается дважды'
+
+        with open(settings.PROFILING_LOG, encoding='utf-8') as log:
+            record = json.loads(log.readline())
+        assert record['queries'] > 0, \
+            'Проверьте, что в журнал пишется число SQL-запросов'
+        assert 'post.html' in record['templates_ms'], \
+            'Проверьте, что в журнал пишется время рендера шаблонов'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_disabled_by_default(self, settings):
+        settings.PROFILING_SAMPLE_RATE = 0
+        response = Client().get('/')
+        assert 'Server-Timing' not in response, \
+            'Проверьте, что без PROFILING_SAMPLE_RATE профилирование выключено'
@@ -0,0 +1,62 @@
+import re
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from posts import timeline
+from posts.models import Comment, Post
+from posts.pagination import CursorPaginator
+
+FULL_SCAN = re.compile(r'SCAN (TABLE )?posts_\w+( AS \w+)?$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class TestQueryPlans:
+
+    def assert_indexed(self, name, queryset):
+        plan = query_plan(queryset)
+        for step in plan:
+            assert not FULL_SCAN.search(step), \
+                f'Проверьте индексы: запрос `{name}` читает таблицу целиком ({plan})'
+            assert TEMP_SORT not in step, \
+                f'Проверьте индексы: запрос `{name}` сортируется во временном B-дереве ({plan})'
+
+    @pytest.mark.django_db
+    def test_feed_queries_use_indexes(self, user, group):
+        position = (timezone.now(), 100)
+        feeds = {
+            'index': Post.objects.for_feed(),
+            'group': group.posts.for_feed(),
+            'profile': user.posts.for_feed(),
+        }
+        for name, queryset in feeds.items():
+            self.assert_indexed(name, queryset[:10])
+            paginator = CursorPaginator(queryset, 10)
+            self.assert_indexed(f'{name}, следующая страница',
+                                paginator.forward_queryset(position))
+            self.assert_indexed(f'{name}, предыдущая страница',
+                                paginator.backward_queryset(position))
+
+        self.assert_indexed('follow',
+                            timeline.timeline_posts(user).for_feed()[:10])
+
+        # Лента подписок без входящих (POSTS_TIMELINE_ENABLED = False)
+        # сливает посты нескольких авторов и сортируется во временном
+        # B-дереве: это известное исключение, но таблицы читаются по индексам.
+        plan = query_plan(Post.objects.for_feed().filter(
+            author__following__user=user
+        )[:10])
+        assert not any(FULL_SCAN.search(step) for step in plan), \
+            f'Проверьте индексы: лента подписок читает таблицу целиком ({plan})'
+        assert any(TEMP_SORT in step for step in plan), \
+            f'План ленты подписок без входящих изменился, обновите тест ({plan})'
+        self.assert_indexed('comments',
+                            Comment.objects.filter(post_id=1)[:50])
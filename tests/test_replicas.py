@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+from posts.models import Post
+from yatube import routers
+
+SCRIPT = '''
+import json, shutil
+from django.db import connection
+from django.test import Client
+from django.contrib.auth import get_user_model
+from posts.models import Post
+
+author = get_user_model().objects.create_user(username='author')
+Post.objects.create(text='Пост до копии', author=author)
+connection.cursor().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+shutil.copy(PRIMARY, REPLICA)
+Post.objects.create(text='Пост после копии', author=author)
+
+client = Client()
+anonymous = client.get('/').content.decode()
+client.force_login(author)
+client.post('/new/', {'text': 'Свой пост'})
+pinned = client.get('/').content.decode()
+print(json.dumps({
+    'anonymous': ['до копии' in anonymous, 'после копии' in anonymous],
+    'pinned': 'Свой пост' in pinned,
+    'cookie': routers.PIN_COOKIE in client.cookies,
+}))
+'''
+
+
+class TestReplicaRouter:
+
+    def test_reads_go_to_replica_only_in_marked_views(self, settings):
+        settings.REPLICA_DATABASES = ['replica']
+        router = routers.ReplicaRouter()
+        assert router.db_for_read(Post) is None, \
+            'Проверьте, что вне read_replica чтение идёт в default'
+        with routers.replica_reads():
+            assert router.db_for_read(Post) == 'replica', \
+                'Проверьте, что внутри read_replica чтение идёт на реплику'
+            assert router.db_for_write(Post) == 'default', \
+                'Проверьте, что запись идёт в default'
+            assert router.db_for_read(Post) is None, \
+                'Проверьте, что после записи запрос читает из default'
+
+    def test_two_sqlite_files(self, tmp_path):
+        primary, replica = tmp_path / 'primary.sqlite3', tmp_path / 'replica.sqlite3'
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='yatube.settings_prod',
+                   DB_NAME=str(primary), DB_REPLICAS=str(replica),
+                   ALLOWED_HOSTS='testserver', CACHE_BACKEND='locmem',
+                   EVENTS_LOCATION='', SECRET_KEY='test')
+        manage = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py')]
+        subprocess.run(manage + ['migrate', '-v0'], env=env, check=True)
+        script = (f'PRIMARY, REPLICA = {str(primary)!r}, {str(replica)!r}\n'
+                  f'from yatube import routers\n{SCRIPT}')
+        output = subprocess.run(manage + ['shell', '-c', script], env=env,
+                                check=True, capture_output=True, text=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+
+        assert result['anonymous'] == [True, False], \
+            'Проверьте, что главная страница читает посты с реплики'
+        assert result['cookie'] and result['pinned'], \
+            'Проверьте, что после записи пользователь читает из основной базы'
@@ -0,0 +1,41 @@
+import pytest
+
+from posts import search
+from posts.models import Post
+
+
+@pytest.fixture(params=['fts5', 'inverted'])
+def search_backend(request, settings):
+    settings.POSTS_SEARCH_BACKEND = request.param
+    search.get_backend().rebuild()
+    return request.param
+
+
+class TestSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_ranked(self, search_backend, client, user):
+        Post.objects.create(text='Кот гуляет сам по себе', author=user)
+        best = Post.objects.create(text='Кот, кот и ещё раз кот', author=user)
+        Post.objects.create(text='Собака лает', author=user)
+
+        ids = search.search_posts('кот')
+        assert len(ids) == 2, f'Проверьте, что поиск ({search_backend}) находит все посты со словом'
+        assert ids[0] == best.pk, f'Проверьте ранжирование результатов поиска ({search_backend})'
+
+        response = client.get('/search/', {'q': 'Собака'})
+        assert [post.text for post in response.context['page']] == ['Собака лает'], \
+            'Проверьте, что страница `/search/` выводит найденные посты'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_follows_edits(self, search_backend, user):
+        post = Post.objects.create(text='Старый текст', author=user)
+        post.text = 'Новый текст'
+        post.save()
+        assert search.search_posts('старый') == [], \
+            'Проверьте, что поисковый индекс обновляется при редактировании'
+        assert search.search_posts('новый') == [post.pk], \
+            'Проверьте, что отредактированный пост находится по новому тексту'
+        post.delete()
+        assert search.search_posts('новый') == [], \
+            'Проверьте, что удалённый пост пропадает из поиска'
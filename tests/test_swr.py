@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from posts import swr
+from posts.models import Post
+
+
+class TestStaleWhileRevalidate:
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'значение'
+
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(swr.get_or_compute('swr:miss', compute, 60))
+        ) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1, \
+            'Проверьте, что одновременные промахи ждут одно вычисление'
+        assert results == ['значение'] * 8, \
+            'Проверьте, что все запросы получают вычисленное значение'
+
+    def test_stale_value_served_while_refreshing(self, settings):
+        settings.FEED_CACHE_ASYNC = False
+        swr._store('swr:stale', 'старое', 0, timeout=-1)
+        assert swr.get_or_compute('swr:stale', lambda: 'новое', 60) == 'старое', \
+            'Проверьте, что устаревшее значение отдаётся сразу'
+        assert swr.get_or_compute('swr:stale', lambda: 'третье', 60) == 'новое', \
+            'Проверьте, что устаревшее значение пересчитывается'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_fragment_refreshed_in_background(self, monkeypatch, user,
+                                                   user_client):
+        # Анонимам страница отдаётся из кеша целиком, поэтому фрагмент
+        # проверяем под пользователем.
+        Post.objects.create(text='Старый пост', author=user)
+        client = user_client
+        client.get('/')
+        # bulk_create не отправляет сигналы, и версия ленты не меняется.
+        Post.objects.bulk_create([Post(text='Новый пост', author=user)])
+        monkeypatch.setattr(swr, '_is_fresh', lambda *args: False)
+
+        response = client.get('/')
+        assert 'Новый пост' not in response.content.decode(), \
+            'Проверьте, что устаревший фрагмент ленты отдаётся без ожидания'
+        deadline = time.monotonic() + 5
+        while 'Новый пост' not in client.get('/').content.decode():
+            assert time.monotonic() < deadline, \
+                'Проверьте, что фрагмент ленты пересчитывается в фоне'
+            time.sleep(0.05)
@@ -0,0 +1,41 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.base import File
+
+from posts import thumbnails
+from posts.models import Post
+
+
+def get_image_file(name):
+    file_obj = BytesIO()
+    Image.new('RGB', size=(50, 50), color=(255, 0, 0)).save(file_obj, 'png')
+    file_obj.seek(0)
+    return File(file_obj, name=name)
+
+
+class TestThumbnails:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_placeholder_until_ready(self, settings, monkeypatch, user_client, user):
+        settings.THUMBNAIL_ASYNC = True
+        queued = []
+        monkeypatch.setattr(thumbnails, '_submit', queued.append)
+        cache.clear()
+
+        user_client.post('/new/', data={'text': 'Пост с картинкой',
+                                        'image': get_image_file('thumb.png')})
+        post = Post.objects.get(text='Пост с картинкой')
+        assert queued == [post.pk], \
+            'Проверьте, что new_post ставит нарезку миниатюр в очередь'
+
+        response = user_client.get('/')
+        assert '<img class="card-img"' not in response.content.decode(), \
+            'Проверьте, что до нарезки миниатюры лента показывает заглушку'
+
+        thumbnails.generate(post.pk)
+        response = user_client.get('/')
+        assert '<img class="card-img"' in response.content.decode(), \
+            'Проверьте, что после нарезки лента показывает миниатюру'
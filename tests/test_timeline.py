@@ -0,0 +1,71 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from posts.models import Post, TimelineEntry
+
+
+@pytest.fixture
+def timeline_settings(settings):
+    settings.POSTS_TIMELINE_ENABLED = True
+    settings.POSTS_TIMELINE_CELEBRITY_FOLLOWERS = 1
+    return settings
+
+
+class TestTimeline:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_fan_out_on_write(self, timeline_settings, user_client, user):
+        author = get_user_model().objects.create_user(username='TimelineAuthor')
+        old_post = Post.objects.create(text='Старый пост', author=author)
+
+        user_client.get(f'/{author.username}/follow/')
+        assert TimelineEntry.objects.filter(user=user, post=old_post).exists(), \
+            'Проверьте, что при подписке старые посты автора попадают во входящие'
+
+        new_post = Post.objects.create(text='Новый пост', author=author)
+        assert TimelineEntry.objects.filter(user=user, post=new_post).exists(), \
+            'Проверьте, что новый пост раздаётся во входящие подписчиков'
+
+        response = user_client.get('/follow/')
+        assert list(response.context['page']) == [new_post, old_post], \
+            'Проверьте, что лента подписок читается из входящих'
+
+        user_client.get(f'/{author.username}/unfollow/')
+        assert not TimelineEntry.objects.filter(user=user).exists(), \
+            'Проверьте, что при отписке посты автора убираются из входящих'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_celebrity_merged_on_read(self, timeline_settings, user_client, user):
+        celebrity = get_user_model().objects.create_user(username='Celebrity')
+        fan = get_user_model().objects.create_user(username='Fan')
+        user_client.get(f'/{celebrity.username}/follow/')
+        user_client.force_login(fan)
+        user_client.get(f'/{celebrity.username}/follow/')
+
+        post = Post.objects.create(text='Пост знаменитости', author=celebrity)
+        assert not TimelineEntry.objects.filter(post=post).exists(), \
+            'Проверьте, что посты авторов-знаменитостей не раздаются при записи'
+
+        response = user_client.get('/follow/')
+        assert list(response.context['page']) == [post], \
+            'Проверьте, что посты знаменитостей подмешиваются в ленту при чтении'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_former_celebrity_posts_stay_in_feed(self, timeline_settings,
+                                                 user_client, user):
+        celebrity = get_user_model().objects.create_user(username='Celebrity')
+        fan = get_user_model().objects.create_user(username='Fan')
+        user_client.get(f'/{celebrity.username}/follow/')
+        user_client.force_login(fan)
+        user_client.get(f'/{celebrity.username}/follow/')
+        post = Post.objects.create(text='Пост знаменитости', author=celebrity)
+
+        user_client.get(f'/{celebrity.username}/unfollow/')
+        assert not TimelineEntry.objects.filter(post=post).exists(), \
+            'Проверьте, что посты раздаются очередью задач, а не в запросе'
+        call_command('run_jobs', '--once', '--poll', '0.01')
+        user_client.force_login(user)
+        response = user_client.get('/follow/')
+        assert list(response.context['page']) == [post], \
+            'Проверьте, что посты бывшей знаменитости остаются в ленте подписчиков'
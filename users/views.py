@@ -1,7 +1,6 @@
 from django.views.generic import CreateView
 
-from django.urls import reverse_lazy
-from django.core.mail import send_mail
+from jobs.mail import send_email
 from .forms import CreationForm
 
 
@@ -9,9 +8,14 @@ class SignUp(CreateView):
     form_class = CreationForm
     success_url = "/auth/login/"
     template_name = "signup.html"
-    send_mail(
-        'Регистрация',
-        'Вы успешно прошли регистрацию на сайте',
-        'from@example.com',  # Это поле От:
-        ['to@example.com'],  # Это поле Кому:
-        fail_silently=False,)
\ No newline at end of file
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        # Письмо отправит воркер очереди задач, а не этот запрос.
+        if self.object.email:
+            send_email.delay(
+                subject='Регистрация',
+                message='Вы успешно прошли регистрацию на сайте',
+                recipients=[self.object.email],
+            )
+        return response
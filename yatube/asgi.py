@@ -0,0 +1,399 @@
+"""
+ASGI-приложение: весь сайт и живые обновления через Server-Sent Events.
+
+Запуск: uvicorn yatube.asgi:application
+
+Django 2.2 не умеет ASGI, поэтому приложение написано прямо на
+протоколе ASGI. Адреса событий оно обслуживает само:
+
+    /events/                          новые посты всей ленты
+    /events/group/<slug>/             новые посты группы
+    /events/<username>/               новые посты автора
+    /events/<username>/<post_id>/     новые комментарии к посту
+
+Остальные запросы идут в обычный обработчик Django. Цикл asyncio сам
+принимает тело запроса и отправляет ответ, а представление выполняется
+в пуле из ASGI_THREADS потоков. Поток занят только на время работы
+Django, а не пока медленный клиент передаёт запрос или читает ответ.
+Число потоков, а с ним соединений с базой и памяти, ограничено, и
+лишние запросы ждут в очереди цикла, а не в отдельных потоках.
+
+Все соединения воркера обслуживает один цикл asyncio, без потока на
+клиента. Один опрос журнала posts.events раз в EVENTS_POLL_INTERVAL
+раскладывает события по очередям подписчиков (Hub). Клиент, который не
+успевает читать, отключается и дочитывает пропущенное по Last-Event-ID.
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+import tempfile
+from collections import defaultdict
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from posts import events  # noqa: E402
+from posts.models import Group, Post, User  # noqa: E402
+from yatube.utils import LazyExecutor  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+
+
+def _feed():
+    return events.FEED
+
+
+def _group(slug):
+    group = Group.objects.values_list('id', flat=True).get(slug=slug)
+    return events.group_channel(group)
+
+
+def _author(username):
+    user = User.objects.values_list('id', flat=True).get(username=username)
+    return events.author_channel(user)
+
+
+def _post(username, post_id):
+    post = Post.objects.values_list('id', flat=True).get(
+        id=post_id, author__username=username
+    )
+    return events.post_channel(post)
+
+
+ROUTES = [
+    (re.compile(r'^/events/$'), _feed),
+    (re.compile(r'^/events/group/(?P<slug>[-\w]+)/$'), _group),
+    (re.compile(r'^/events/(?P<username>[^/]+)/$'), _author),
+    (re.compile(r'^/events/(?P<username>[^/]+)/(?P<post_id>\d+)/$'), _post),
+]
+
+
+def _channel(path):
+    """
+    Канал для адреса или None, если адреса или объекта нет.
+    """
+    try:
+        for pattern, channel in ROUTES:
+            match = pattern.match(path)
+            if match:
+                return channel(**match.groupdict())
+        return None
+    except (Group.DoesNotExist, User.DoesNotExist, Post.DoesNotExist):
+        return None
+    finally:
+        connection.close()
+
+
+class Subscription:
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.lagging = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+
+class Hub:
+    """
+    Подписчики каналов в этом процессе и опрос общего журнала событий.
+    """
+
+    def __init__(self):
+        self.subscriptions = defaultdict(set)
+        self.last_id = None
+        self._poller = None
+
+    async def start(self):
+        """
+        Запускает опрос журнала. Без подписчиков опрос журнал не читает,
+        поэтому первый подписчик начинает с текущего конца журнала, а не
+        с событий, накопившихся за время простоя.
+        """
+        running = self._poller is not None and not self._poller.done()
+        if running and self.subscriptions:
+            return
+        loop = asyncio.get_running_loop()
+        last_id = await loop.run_in_executor(
+            None, events.get_relay().last_id
+        )
+        if self.subscriptions:
+            # Пока читали журнал, подписался другой клиент: его события
+            # уже разбирает опрос, сдвигать last_id нельзя.
+            return
+        self.last_id = last_id
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.ensure_future(self._poll())
+
+    async def stop(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel)
+        self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscribers = self.subscriptions.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscriptions[subscription.channel]
+
+    def dispatch(self, rows):
+        for row in rows:
+            for channel in row[1]:
+                for subscription in self.subscriptions.get(channel, ()):
+                    subscription.put(row)
+            self.last_id = row[0]
+
+    async def _poll(self):
+        loop = asyncio.get_running_loop()
+        relay = events.get_relay()
+        while True:
+            await asyncio.sleep(settings.EVENTS_POLL_INTERVAL)
+            if not self.subscriptions:
+                continue
+            try:
+                rows = await loop.run_in_executor(
+                    None, relay.read_after, self.last_id
+                )
+            except Exception:
+                logger.exception('Не удалось прочитать журнал событий')
+                continue
+            self.dispatch(rows)
+
+
+hub = Hub()
+
+
+def _message(row):
+    pk, _, event, data = row
+    return f'id: {pk}\nevent: {event}\ndata: {data}\n\n'.encode()
+
+
+def _last_event_id(scope):
+    for name, value in scope['headers']:
+        if name == b'last-event-id':
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+async def _replay(channel, after, until):
+    loop = asyncio.get_running_loop()
+    rows = await loop.run_in_executor(
+        None, events.get_relay().read_after, after
+    )
+    return [row for row in rows if row[0] <= until and channel in row[1]]
+
+
+async def _respond(send, status, body=b''):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _disconnect(receive):
+    # Первое сообщение — тело запроса, дальше ждём только отключения.
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await hub.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def stream(scope, receive, send):
+    loop = asyncio.get_running_loop()
+    channel = await loop.run_in_executor(None, _channel, scope['path'])
+    if channel is None:
+        await _respond(send, 404, 'Не найдено'.encode())
+        return
+    await hub.start()
+
+    # Подписка раньше дочитывания: события после last_id придут в
+    # очередь, а дочитывание закроет промежуток до него.
+    subscription = hub.subscribe(channel)
+    until = hub.last_id
+    disconnected = asyncio.ensure_future(_disconnect(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'text/event-stream'),
+                                (b'cache-control', b'no-cache'),
+                                (b'x-accel-buffering', b'no')]})
+        body = b'retry: 3000\n\n'
+        last_event_id = _last_event_id(scope)
+        if last_event_id is not None:
+            for row in await _replay(channel, last_event_id, until):
+                body += _message(row)
+        await send({'type': 'http.response.body', 'body': body,
+                    'more_body': True})
+
+        while not subscription.lagging:
+            message = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {message, disconnected},
+                timeout=settings.EVENTS_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                message.cancel()
+                return
+            if message in done:
+                body = _message(message.result())
+            else:
+                message.cancel()
+                body = b': ping\n\n'
+            await send({'type': 'http.response.body', 'body': body,
+                        'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        hub.unsubscribe(subscription)
+        disconnected.cancel()
+
+
+_django = WSGIHandler()
+_pool = LazyExecutor('ASGI_THREADS', 8, 'django')
+
+
+async def _read_body(receive):
+    """
+    Тело запроса в файле (в памяти, пока оно небольшое) или None, если
+    клиент отключился.
+    """
+    body = tempfile.SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    )
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            body.close()
+            return None
+        body.write(message.get('body', b''))
+        if not message.get('more_body'):
+            body.seek(0)
+            return body
+
+
+def _environ(scope, body):
+    """
+    Окружение WSGI для запроса ASGI.
+    """
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        if name in environ:
+            separator = '; ' if name == 'HTTP_COOKIE' else ','
+            value = environ[name] + separator + value
+        environ[name] = value
+    return environ
+
+
+def _call_django(environ, loop, send):
+    """
+    Выполняет запрос в потоке пула. Обычный ответ возвращается целиком
+    и отправляется циклом уже после освобождения потока. Потоковый
+    ответ (выгрузка) читается здесь же, потому что его запросы к базе
+    идут через соединение этого потока.
+    """
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers
+        ]
+
+    response = _django(environ, start_response)
+    try:
+        if not getattr(response, 'streaming', False):
+            return started, b''.join(response)
+
+        def send_and_wait(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        send_and_wait({'type': 'http.response.start', **started})
+        for chunk in response:
+            send_and_wait({'type': 'http.response.body', 'body': chunk,
+                           'more_body': True})
+        send_and_wait({'type': 'http.response.body', 'body': b''})
+        return None, None
+    finally:
+        response.close()
+
+
+async def django_view(scope, receive, send):
+    body = await _read_body(receive)
+    if body is None:
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        started, content = await loop.run_in_executor(
+            _pool.get(), _call_django, _environ(scope, body), loop, send
+        )
+    finally:
+        body.close()
+    if started is not None:
+        await send({'type': 'http.response.start', **started})
+        await send({'type': 'http.response.body', 'body': content})
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+    elif scope['type'] != 'http':
+        return
+    elif not scope['path'].startswith('/events/'):
+        await django_view(scope, receive, send)
+    elif scope['method'] == 'GET':
+        await stream(scope, receive, send)
+    else:
+        await _respond(send, 405)
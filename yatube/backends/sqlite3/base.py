@@ -0,0 +1,38 @@
+"""
+SQLite для одного сервера с конкурентными записями.
+
+Журнал WAL позволяет читать во время записи, а транзакции начинаются
+с BEGIN IMMEDIATE: блокировка записи берётся сразу и ждёт timeout
+секунд, а не падает с «database is locked» при попытке повысить
+читающую транзакцию до пишущей.
+
+Параметры OPTIONS: timeout (секунды ожидания блокировки, по умолчанию
+20), journal_mode (WAL), synchronous (NORMAL), begin (IMMEDIATE).
+"""
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'NORMAL'}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = {name: options.get(name, default)
+                        for name, default in PRAGMAS.items()}
+        self.begin = options.get('begin', 'IMMEDIATE')
+        params = super().get_connection_params()
+        for name in (*PRAGMAS, 'begin'):
+            params.pop(name, None)
+        params.setdefault('timeout', 20)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        if not self.is_in_memory_db():
+            for name, value in self.pragmas.items():
+                conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.begin}')
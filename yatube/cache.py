@@ -0,0 +1,211 @@
+"""
+Общий для всех воркеров кеш в файле SQLite, без внешних сервисов.
+
+Записи лежат в таблице cache (ключ, pickle значения, срок жизни), файл
+открыт в режиме WAL, так что читатели не ждут писателей. Каждые
+CULL_EVERY записей удаляются просроченные значения, а при превышении
+MAX_ENTRIES — ещё и 1/CULL_FREQUENCY записей с ближайшим сроком жизни.
+
+Попадания, промахи, записи и вытеснения считаются в памяти потока и
+складываются в таблицу cache_stats в конце запроса (close()), поэтому
+stats() показывает сумму по всем воркерам.
+"""
+import pickle
+import time
+from collections import Counter
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from .utils import LocalSQLite
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+STATS = ('hits', 'misses', 'sets', 'deletes', 'evictions', 'expired')
+
+
+class SQLiteCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = location
+        self.cull_every = int(options.get('CULL_EVERY', 100))
+        self.busy_timeout = float(options.get('BUSY_TIMEOUT', 5))
+        self._sqlite = LocalSQLite(self.path, SCHEMA, self.busy_timeout,
+                                   self._reset_local)
+        self._local = self._sqlite.local
+
+    @property
+    def _db(self):
+        return self._sqlite.db
+
+    def _reset_local(self, local):
+        local.stats = Counter()
+        local.sets = 0
+
+    def _count(self, name, value=1):
+        self._local.stats[name] += value
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _alive(self, expires):
+        return expires is None or expires > time.time()
+
+    def get(self, key, default=None, version=None):
+        row = self._db.execute(
+            'SELECT value, expires FROM cache WHERE key = ?',
+            (self._key(key, version),)
+        ).fetchone()
+        if row is None or not self._alive(row[1]):
+            self._count('misses')
+            return default
+        self._count('hits')
+        return pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        rows = self._db.execute(
+            'SELECT key, value, expires FROM cache WHERE key IN (%s)'
+            % ', '.join('?' * len(keys)), list(keys)
+        ).fetchall()
+        found = {keys[key]: pickle.loads(value)
+                 for key, value, expires in rows if self._alive(expires)}
+        self._count('hits', len(found))
+        self._count('misses', len(keys) - len(found))
+        return found
+
+    def _rows(self, data, timeout, version):
+        expires = self.get_backend_timeout(timeout)
+        return [(self._key(key, version),
+                 pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+                for key, value in data.items()]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        rows = self._rows(data, timeout, version)
+        db = self._db
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            db.executemany('INSERT OR REPLACE INTO cache VALUES (?, ?, ?)',
+                           rows)
+        self._after_set(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        row = self._rows({key: value}, timeout, version)[0]
+        added = self._db.execute(
+            'INSERT INTO cache VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE '
+            'SET value = excluded.value, expires = excluded.expires '
+            'WHERE cache.expires IS NOT NULL AND cache.expires <= ?',
+            row + (time.time(),)
+        ).rowcount
+        if added:
+            self._after_set(1)
+        return bool(added)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return bool(self._db.execute(
+            'UPDATE cache SET expires = ? WHERE key = ?',
+            (self.get_backend_timeout(timeout), self._key(key, version))
+        ).rowcount)
+
+    def incr(self, key, delta=1, version=None):
+        # В одной транзакции, чтобы воркеры не теряли увеличения.
+        key = self._key(key, version)
+        db = self._db
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            row = db.execute('SELECT value, expires FROM cache WHERE key = ?',
+                             (key,)).fetchone()
+            if row is None or not self._alive(row[1]):
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            db.execute('UPDATE cache SET value = ? WHERE key = ?',
+                       (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key))
+        return value
+
+    def has_key(self, key, version=None):
+        row = self._db.execute('SELECT expires FROM cache WHERE key = ?',
+                               (self._key(key, version),)).fetchone()
+        return row is not None and self._alive(row[0])
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            deleted = self._db.execute(
+                'DELETE FROM cache WHERE key IN (%s)'
+                % ', '.join('?' * len(keys)), keys
+            ).rowcount
+            self._count('deletes', deleted)
+
+    def clear(self):
+        self._db.execute('DELETE FROM cache')
+
+    def _after_set(self, count):
+        self._count('sets', count)
+        self._local.sets += count
+        if self._local.sets >= self.cull_every:
+            self._local.sets = 0
+            self.cull()
+
+    def cull(self):
+        db = self._db
+        expired = db.execute('DELETE FROM cache WHERE expires <= ?',
+                             (time.time(),)).rowcount
+        self._count('expired', expired)
+        total = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if total > self._max_entries:
+            # CULL_FREQUENCY = 0 означает очистить всё, как в Django.
+            evicted = db.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY expires IS NULL, expires LIMIT ?)',
+                (total // self._cull_frequency if self._cull_frequency
+                 else total,)
+            ).rowcount
+            self._count('evictions', evicted)
+
+    def flush_stats(self):
+        stats = getattr(self._local, 'stats', None)
+        if not stats:
+            return
+        self._local.stats = Counter()
+        self._db.executemany(
+            'INSERT INTO cache_stats VALUES (?, ?) ON CONFLICT (name) '
+            'DO UPDATE SET value = value + excluded.value',
+            stats.items()
+        )
+
+    def stats(self):
+        """
+        Счётчики кеша по всем воркерам и число записей.
+        """
+        self.flush_stats()
+        stats = dict.fromkeys(STATS, 0)
+        stats.update(self._db.execute('SELECT name, value FROM cache_stats'))
+        stats['entries'] = self._db.execute(
+            'SELECT COUNT(*) FROM cache'
+        ).fetchone()[0]
+        return stats
+
+    def close(self, **kwargs):
+        self.flush_stats()
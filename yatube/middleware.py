@@ -0,0 +1,151 @@
+"""
+Профилирование запросов: число SQL-запросов, время в базе, повторы
+запросов (N+1), собственное время рендера каждого шаблона (без
+вложенных) и время представления.
+
+Замеряется доля запросов PROFILING_SAMPLE_RATE. Для них в ответ
+добавляется заголовок Server-Timing, а запись пишется строкой JSON
+в PROFILING_LOG. При нулевой доле middleware отключается целиком.
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_original_render = Template.render
+
+
+def _profiled_render(self, context):
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return _original_render(self, context)
+    # Вложенные шаблоны ({% include %}) тоже проходят через render:
+    # их время вычитается из родителя, чтобы не считать его дважды.
+    profile.nested.append(0)
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        duration = time.perf_counter() - start
+        children = profile.nested.pop()
+        if profile.nested:
+            profile.nested[-1] += duration
+        profile.add_template(self.origin.template_name or self.origin.name,
+                             duration - children)
+
+
+class Profile:
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.view_start = None
+        self.view_time = 0
+        self.db_time = 0
+        self.queries = Counter()
+        # Собственное время шаблона без вложенных шаблонов.
+        self.templates = defaultdict(float)
+        self.nested = []
+
+    def add_template(self, name, duration):
+        self.templates[str(name)] += duration
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries[sql] += 1
+
+    def duplicates(self):
+        """
+        Запросы, выполненные больше одного раза: обычно это N+1.
+        """
+        return {sql: count for sql, count in self.queries.items()
+                if count > 1}
+
+    def server_timing(self, total):
+        duplicated = sum(count - 1 for count in self.duplicates().values())
+        metrics = [
+            ('db', self.db_time,
+             f'{sum(self.queries.values())} queries, {duplicated} duplicated'),
+            ('tpl', sum(self.templates.values()), 'templates'),
+            ('view', self.view_time, 'view'),
+            ('total', total, 'total'),
+        ]
+        return ', '.join(f'{name};dur={duration * 1000:.1f};desc="{desc}"'
+                         for name, duration, desc in metrics)
+
+    def record(self, request, response, total):
+        return {
+            'time': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'view_ms': round(self.view_time * 1000, 2),
+            'db_ms': round(self.db_time * 1000, 2),
+            'queries': sum(self.queries.values()),
+            'duplicates': self.duplicates(),
+            'templates_ms': {name: round(duration * 1000, 2)
+                             for name, duration in self.templates.items()},
+        }
+
+
+def write_record(record):
+    path = getattr(settings, 'PROFILING_LOG', None)
+    if not path:
+        return
+    line = json.dumps(record, ensure_ascii=False) + '\n'
+    with _log_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as log:
+            log.write(line)
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует случайную долю запросов, см. описание модуля.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        Template.render = _profiled_render
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = _local.profile = Profile()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _local.profile = None
+        total = time.perf_counter() - profile.start
+        if profile.view_start is not None:
+            profile.view_time = time.perf_counter() - profile.view_start
+
+        response['Server-Timing'] = profile.server_timing(total)
+        write_record(profile.record(request, response, total))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(_local, 'profile', None)
+        if profile is not None:
+            profile.view_start = time.perf_counter()
@@ -0,0 +1,94 @@
+"""
+Чтение лент с реплик базы данных.
+
+Запросы идут на реплики из REPLICA_DATABASES только внутри представлений
+с декоратором read_replica; всё остальное, включая запись, идёт в
+'default'. После записи пользователь REPLICA_PIN_SECONDS секунд читает
+с основной базы (кука), чтобы видеть свои изменения, пока реплика
+догоняет.
+"""
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'primary_pin'
+
+_state = threading.local()
+
+
+def replicas():
+    return getattr(settings, 'REPLICA_DATABASES', [])
+
+
+@contextmanager
+def replica_reads():
+    previous = (getattr(_state, 'replica', False),
+                getattr(_state, 'pinned', False))
+    _state.replica, _state.pinned = True, False
+    try:
+        yield
+    finally:
+        _state.replica, _state.pinned = previous
+
+
+def read_replica(view):
+    """
+    Разрешает представлению читать с реплики.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if getattr(_state, 'pinned', False):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (not getattr(_state, 'replica', False)
+                or getattr(_state, 'pinned', False)
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block
+                or not replicas()):
+            return None
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        # Дальше в этом запросе читаем свою же запись с основной базы.
+        _state.pinned = _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схему на реплики переносит репликация.
+        return db not in replicas()
+
+
+class ReplicaPinningMiddleware:
+    """
+    Закрепляет за пользователем основную базу после записи.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.pinned = PIN_COOKIE in request.COOKIES
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+            wrote = _state.wrote
+        finally:
+            _state.pinned = _state.wrote = False
+        if wrote:
+            response.set_cookie(PIN_COOKIE, '1', httponly=True,
+                                max_age=getattr(settings,
+                                                'REPLICA_PIN_SECONDS', 5))
+        return response
@@ -38,6 +38,7 @@ ALLOWED_HOSTS = [
 INSTALLED_APPS = [
     'users',
     'posts',
+    'jobs',
     "django.contrib.sites",
     "django.contrib.flatpages",
     'django.contrib.admin',
@@ -50,11 +51,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yatube.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yatube.routers.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -86,7 +89,7 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yatube.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
@@ -141,10 +144,65 @@ LOGIN_REDIRECT_URL = "index"
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+DEFAULT_FROM_EMAIL = 'from@example.com'
 SITE_ID = 1
 
+# Общий для всех воркеров кеш в файле SQLite. KEY_PREFIX разделяет
+# проекты в одном кеше, увеличение VERSION сбрасывает весь кеш сразу.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'yatube.cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'default.sqlite3'),
+        'KEY_PREFIX': 'yatube',
+        'VERSION': 1,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
     }
-}
\ No newline at end of file
+}
+# Реплики для чтения лент; пусто — всё читается из default
+DATABASE_ROUTERS = ['yatube.routers.ReplicaRouter']
+REPLICA_DATABASES = []
+# Сколько секунд после записи пользователь читает с основной базы
+REPLICA_PIN_SECONDS = 5
+
+# Курсорная паджинация лент по (pub_date, id) вместо номеров страниц
+POSTS_CURSOR_PAGINATION = False
+
+# Лента подписок с раздачей постов во входящие при публикации
+POSTS_TIMELINE_ENABLED = False
+# Авторы с большим числом подписчиков подмешиваются в ленту при чтении
+POSTS_TIMELINE_CELEBRITY_FOLLOWERS = 1000
+
+# Миниатюры нарезаются в фоне пулом из THUMBNAIL_WORKERS потоков
+THUMBNAIL_ASYNC = True
+THUMBNAIL_WORKERS = 2
+
+# Доля запросов, для которых пишутся Server-Timing и запись в PROFILING_LOG
+PROFILING_SAMPLE_RATE = 0
+PROFILING_LOG = os.path.join(BASE_DIR, 'logs', 'profiling.jsonl')
+
+# Устаревшие фрагменты лент пересчитываются в фоне этим числом потоков
+FEED_CACHE_ASYNC = True
+FEED_CACHE_WORKERS = 2
+
+# Журнал событий для Server-Sent Events (yatube.asgi); None — выключен
+EVENTS_LOCATION = os.path.join(BASE_DIR, 'cache', 'events.sqlite3')
+# Сколько секунд хранятся события для дочитывания по Last-Event-ID
+EVENTS_RETENTION = 3600
+# Как часто воркер SSE проверяет журнал и шлёт клиентам пустой пинг
+EVENTS_POLL_INTERVAL = 0.5
+EVENTS_HEARTBEAT = 15
+# Потоки, в которых yatube.asgi выполняет представления Django
+ASGI_THREADS = 8
+
+# Фоновые задачи (manage.py run_jobs): одновременно выполняемые задачи,
+# попытки, задержка перед первым повтором (дальше вдвое больше) и её
+# предел, секунды до освобождения задачи упавшего воркера
+JOBS_CONCURRENCY = 4
+JOBS_MAX_ATTEMPTS = 5
+JOBS_BACKOFF = 30
+JOBS_MAX_BACKOFF = 3600
+JOBS_LOCK_TIMEOUT = 300
+# Письма авторам о подписчиках и комментариях через очередь задач
+POSTS_EMAIL_NOTIFICATIONS = True
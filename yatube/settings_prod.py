@@ -0,0 +1,128 @@
+"""
+Настройки для продакшена: всё берётся из переменных окружения.
+
+Запуск: DJANGO_SETTINGS_MODULE=yatube.settings_prod
+
+Обязательно задать SECRET_KEY: без него настройки не загрузятся.
+
+База данных:
+    DB_ENGINE        sqlite (по умолчанию), postgresql или полный путь
+                     к бэкенду, например пулу соединений
+    DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+    DB_CONN_MAX_AGE  сколько секунд держать соединение (по умолчанию 60,
+                     0 — закрывать после каждого запроса)
+    DB_POOLER        1, если между приложением и Postgres стоит PgBouncer
+                     в режиме транзакций: серверные курсоры iterator()
+                     с ним не работают
+    DB_TIMEOUT       секунды ожидания блокировки SQLite (по умолчанию 20)
+    DB_REPLICAS      реплики для чтения лент через запятую: файлы SQLite
+                     или хосты Postgres; локально реплику SQLite можно
+                     получить копией основного файла
+
+Кеш:
+    CACHE_BACKEND    sqlite (по умолчанию), file или locmem; locmem не
+                     делится между воркерами
+    CACHE_LOCATION   файл SQLite или каталог файлового кеша
+    CACHE_KEY_PREFIX пространство имён ключей (по умолчанию yatube)
+    CACHE_VERSION    версия ключей: увеличение сбрасывает весь кеш
+
+ASGI:
+    ASGI_THREADS     потоки для представлений в yatube.asgi (по умолчанию 8)
+
+События:
+    EVENTS_LOCATION  файл журнала событий для yatube.asgi, общий для
+                     всех воркеров; пустая строка выключает события
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+
+def env_bool(name, default=False):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def env_list(name, default=''):
+    return [item.strip() for item in os.environ.get(name, default).split(',')
+            if item.strip()]
+
+
+SECRET_KEY = os.environ.get('SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Задайте переменную окружения SECRET_KEY')
+DEBUG = env_bool('DEBUG')
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', 'localhost,127.0.0.1')
+
+DB_ENGINES = {
+    'sqlite': 'yatube.backends.sqlite3',
+    'postgresql': 'django.db.backends.postgresql',
+}
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINES['sqlite'],
+            'NAME': os.environ.get('DB_NAME',
+                                   os.path.join(BASE_DIR, 'db.sqlite3')),
+            'OPTIONS': {
+                'timeout': int(os.environ.get('DB_TIMEOUT', 20)),
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINES.get(DB_ENGINE, DB_ENGINE),
+            'NAME': os.environ.get('DB_NAME', 'yatube'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'DISABLE_SERVER_SIDE_CURSORS': env_bool('DB_POOLER'),
+        }
+    }
+DATABASES['default']['CONN_MAX_AGE'] = int(
+    os.environ.get('DB_CONN_MAX_AGE', 60)
+)
+
+REPLICA_DATABASES = []
+for number, replica in enumerate(env_list('DB_REPLICAS'), 1):
+    alias = f'replica{number}'
+    location = 'NAME' if DB_ENGINE == 'sqlite' else 'HOST'
+    DATABASES[alias] = dict(DATABASES['default'], **{location: replica},
+                            TEST={'MIRROR': 'default'})
+    REPLICA_DATABASES.append(alias)
+
+CACHE_BACKENDS = {
+    'sqlite': ('yatube.cache.SQLiteCache',
+               os.path.join(BASE_DIR, 'cache', 'default.sqlite3')),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache',
+             os.path.join(BASE_DIR, 'cache', 'files')),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', ''),
+}
+CACHE_BACKEND, CACHE_LOCATION = CACHE_BACKENDS[
+    os.environ.get('CACHE_BACKEND', 'sqlite')
+]
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_LOCATION),
+        'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'yatube'),
+        'VERSION': int(os.environ.get('CACHE_VERSION', 1)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 100000)),
+        },
+    }
+}
+
+EVENTS_LOCATION = os.environ.get(
+    'EVENTS_LOCATION', EVENTS_LOCATION  # noqa: F405
+) or None
+
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 8))
+
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
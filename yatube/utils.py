@@ -0,0 +1,69 @@
+"""
+Общие для модулей проекта помощники: соединения с файлами SQLite вне
+ORM и ленивые пулы потоков.
+"""
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+class LocalSQLite:
+    """
+    Соединение с файлом SQLite в режиме WAL, своё у каждого потока и у
+    каждого процесса после fork. При открытии создаются таблицы schema,
+    а on_connect(local) задаёт состояние потока, которое хранится в
+    local рядом с соединением.
+    """
+
+    def __init__(self, path, schema, timeout=5, on_connect=None):
+        self.path = path
+        self.schema = schema
+        self.timeout = timeout
+        self.on_connect = on_connect
+        self.local = threading.local()
+
+    @property
+    def db(self):
+        local = self.local
+        if getattr(local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            local.db = sqlite3.connect(self.path, timeout=self.timeout,
+                                       isolation_level=None)
+            local.db.execute('PRAGMA journal_mode = WAL')
+            local.db.execute('PRAGMA synchronous = NORMAL')
+            local.db.executescript(self.schema)
+            local.pid = os.getpid()
+            if self.on_connect is not None:
+                self.on_connect(local)
+        return local.db
+
+
+class LazyExecutor:
+    """
+    Пул потоков, который создаётся при первой задаче. Размер берётся из
+    настройки setting (по умолчанию workers).
+    """
+
+    def __init__(self, setting, workers, name):
+        self.setting = setting
+        self.workers = workers
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, self.setting, self.workers),
+                    thread_name_prefix=self.name,
+                )
+            return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        return self.get().submit(fn, *args, **kwargs)